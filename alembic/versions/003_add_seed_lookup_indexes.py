@@ -0,0 +1,51 @@
+"""Add composite indexes for energy record, point and ranking lookups
+
+Revision ID: 003_add_seed_lookup_indexes
+Revises: 457e299777ee
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_add_seed_lookup_indexes'
+down_revision = '457e299777ee'
+branch_labels = None
+depends_on = None
+
+
+def _check_no_duplicates(table: str, key_columns: list) -> None:
+    """Stop the upgrade if a unique index on key_columns cannot be built.
+
+    Older seed runs could write the same key twice (30-day date steps, per-row
+    ranking inserts). Which copy to keep is an operator decision, so the rows
+    are reported, not deleted. Keys with a NULL part never conflict in a
+    unique index and are not counted.
+    """
+    keys = ", ".join(key_columns)
+    not_null = " AND ".join(f"{column} IS NOT NULL" for column in key_columns)
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {not_null} "
+        f"GROUP BY {keys} HAVING COUNT(*) > 1) AS duplicate_keys"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{table} has {duplicates} duplicated ({keys}) keys; resolve them before upgrading, "
+            f"e.g. list them with: SELECT {keys}, COUNT(*) FROM {table} "
+            f"GROUP BY {keys} HAVING COUNT(*) > 1"
+        )
+
+
+def upgrade() -> None:
+    _check_no_duplicates('energy_records', ['device_id', 'timestamp'])
+    _check_no_duplicates('rankings', ['company_id', 'user_id'])
+    op.create_index('ix_energy_records_device_id_timestamp', 'energy_records', ['device_id', 'timestamp'], unique=True)
+    op.create_index('ix_points_user_id_earned_at', 'points', ['user_id', 'earned_at'], unique=False)
+    op.create_index('ix_rankings_company_id_user_id', 'rankings', ['company_id', 'user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rankings_company_id_user_id', table_name='rankings')
+    op.drop_index('ix_points_user_id_earned_at', table_name='points')
+    op.drop_index('ix_energy_records_device_id_timestamp', table_name='energy_records')
@@ -1,6 +1,7 @@
 from typing import Any, List, Optional
 from datetime import datetime, date
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.auth.deps import get_current_active_user
@@ -61,7 +62,13 @@ def create_energy_record(
     if not device or device.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="Device not found")
     
-    record = energy_record_service.create_with_user(db=db, obj_in=record_in, user_id=current_user.id)
+    try:
+        record = energy_record_service.create_with_user(db=db, obj_in=record_in, user_id=current_user.id)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=409,
+            detail="An energy record for this device and timestamp already exists",
+        )
     return record
 
 
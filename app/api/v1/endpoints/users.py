@@ -2,13 +2,17 @@ from typing import Any, List, Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_active_user
+from app.auth.deps import get_current_active_user, get_current_admin_user
 from app.db.database import get_db
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.schemas.user import User, UserBulkCreateResult, UserCreate, UserUpdate
 from app.services.user import user_service
 
 router = APIRouter()
 
+# Every user in a bulk request is bcrypt-hashed serially inside the request,
+# so batches are kept small enough to finish well within the request timeout
+MAX_BULK_USERS = 25
+
 
 @router.post("/", response_model=User)
 def create_user(
@@ -29,6 +33,29 @@ def create_user(
     return user
 
 
+@router.post("/bulk", response_model=UserBulkCreateResult)
+def create_users_bulk(
+    *,
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[Session, Depends(get_db)],
+    users_in: List[UserCreate],
+) -> Any:
+    """
+    Create multiple users in one transaction (superusers only). Emails that
+    already exist are listed as conflicts instead of failing the batch.
+    At most MAX_BULK_USERS users are accepted per request.
+    """
+    if len(users_in) > MAX_BULK_USERS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BULK_USERS} users can be created per request",
+        )
+    created, conflicts = user_service.create_many(
+        db, objs_in=users_in, allow_superuser=current_user.is_superuser
+    )
+    return {"created": created, "conflicts": conflicts}
+
+
 @router.put("/me", response_model=User)
 def update_user_me(
     *,
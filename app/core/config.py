@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator, ConfigDict
 from typing import Optional, List, Union
+from functools import cached_property
 import json
 import os
 
@@ -17,6 +18,8 @@ class Settings(BaseSettings):
     
     # Database - Single source of truth
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Optional MySQL driver override (e.g. "mysqldb" for the C-based mysqlclient)
+    MYSQL_DRIVER: Optional[str] = None
     
     # JWT
     SECRET_KEY: str = os.environ.get("SECRET_KEY", "fallback-secret-key-for-development-only-change-in-production")
@@ -62,12 +65,19 @@ class Settings(BaseSettings):
             return self.BACKEND_CORS_ORIGINS if isinstance(self.BACKEND_CORS_ORIGINS, list) else [self.BACKEND_CORS_ORIGINS]
         return self.ALLOWED_ORIGINS
     
-    @property
+    @cached_property
     def sqlalchemy_uri_clean(self) -> str:
         uri = (self.SQLALCHEMY_DATABASE_URI or "").strip()
         if not uri:
             raise ValueError("SQLALCHEMY_DATABASE_URI is required")
+        if self.MYSQL_DRIVER and uri.startswith("mysql"):
+            scheme, sep, rest = uri.partition("://")
+            uri = f"mysql+{self.MYSQL_DRIVER}{sep}{rest}"
         return uri
+    
+    def get_database_url(self) -> str:
+        """Database URL for scripts and diagnostics (computed once, see sqlalchemy_uri_clean)"""
+        return self.sqlalchemy_uri_clean
 
 
 settings = Settings()
\ No newline at end of file
@@ -23,19 +23,24 @@ elif database_url.startswith("mysql+mysqlconnector://"):
         "ssl_disabled": False
     }
 elif database_url.startswith("mysql+mysqldb://") or database_url.startswith("mysql://"):
-    # MySQLdb/mysqlclient
+    # MySQLdb/mysqlclient (C extension, select with MYSQL_DRIVER=mysqldb)
     connect_args = {
         "charset": "utf8mb4", 
         "connect_timeout": 8,
-        "ssl": {"ssl_mode": "REQUIRED"}
+        "ssl_mode": "REQUIRED"
     }
 
 engine = create_engine(
     database_url,
+    # Ping on checkout and recycle well inside MySQL's idle timeouts, so a
+    # connection dropped while pooled is replaced instead of failing the
+    # first query; every script importing this engine gets the same pool
     pool_pre_ping=True,
     pool_recycle=280,
     pool_size=5,
     max_overflow=10,
+    # Rows per multi-row INSERT batch; keeps statements under max_allowed_packet
+    insertmanyvalues_page_size=1000,
     connect_args=connect_args
 )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -6,6 +6,10 @@ from app.db.database import Base
 
 class EnergyRecord(Base):
     __tablename__ = "energy_records"
+    __table_args__ = (
+        # One reading per device and timestamp; also serves the seed's existence lookups
+        Index("ix_energy_records_device_id_timestamp", "device_id", "timestamp", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime(timezone=True), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -6,6 +6,10 @@ from app.db.database import Base
 
 class Ranking(Base):
     __tablename__ = "rankings"
+    __table_args__ = (
+        # One ranking row per user within a company
+        Index("ix_rankings_company_id_user_id", "company_id", "user_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
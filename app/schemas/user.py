@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -36,4 +36,9 @@ class User(UserInDBBase):
 
 
 class UserInDB(UserInDBBase):
-    hashed_password: str
\ No newline at end of file
+    hashed_password: str
+
+
+class UserBulkCreateResult(BaseModel):
+    created: List[User]
+    conflicts: List[EmailStr] = []
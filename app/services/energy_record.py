@@ -2,6 +2,7 @@ from typing import Any, Dict, Optional, Union, List
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
+from sqlalchemy.exc import IntegrityError
 from app.models.energy_record import EnergyRecord
 from app.schemas.energy_record import EnergyRecordCreate, EnergyRecordUpdate
 
@@ -93,10 +94,16 @@ class EnergyRecordService:
     def create_with_user(
         self, db: Session, *, obj_in: EnergyRecordCreate, user_id: int
     ) -> EnergyRecord:
+        """Create a record; raises IntegrityError (after rolling back) if the
+        device already has a record at that timestamp."""
         obj_in_data = obj_in.dict()
         db_obj = EnergyRecord(**obj_in_data, user_id=user_id)
         db.add(db_obj)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise
         db.refresh(db_obj)
         return db_obj
 
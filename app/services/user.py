@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from sqlalchemy.orm import Session
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
@@ -25,6 +25,40 @@ class UserService:
         db.refresh(db_obj)
         return db_obj
 
+    def create_many(
+        self, db: Session, *, objs_in: List[UserCreate], allow_superuser: bool = False
+    ) -> Tuple[List[User], List[str]]:
+        """Create every user whose email is not taken yet, in one transaction.
+
+        Returns the created users and the skipped emails (already registered
+        or repeated in the request), both in request order. is_superuser from
+        the input is only honoured when allow_superuser is set.
+        """
+        emails = [obj_in.email for obj_in in objs_in]
+        # Emails are compared case-insensitively, like the database collation
+        taken = {user.email.lower() for user in db.query(User.email).filter(User.email.in_(emails))}
+        new_users = []
+        conflicts = []
+        for obj_in in objs_in:
+            email = obj_in.email.lower()
+            if email in taken:
+                conflicts.append(obj_in.email)
+                continue
+            taken.add(email)
+            new_users.append(User(
+                email=obj_in.email,
+                hashed_password=get_password_hash(obj_in.password),
+                full_name=obj_in.full_name,
+                is_active=obj_in.is_active,
+                is_superuser=allow_superuser and getattr(obj_in, "is_superuser", False),
+            ))
+        db.add_all(new_users)
+        db.commit()
+        # One query reloads the committed rows instead of a refresh per user
+        new_emails = [user.email for user in new_users]
+        users = {user.email: user for user in db.query(User).filter(User.email.in_(new_emails))}
+        return [users[email] for email in new_emails], conflicts
+
     def update(
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
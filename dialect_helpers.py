@@ -0,0 +1,112 @@
+"""
+Schema introspection helpers dispatching on the connection's dialect
+
+Each helper runs the native catalog query of MySQL, PostgreSQL or SQLite,
+fetching every table in one round-trip. Column rows have the shape of
+MySQL's DESCRIBE: (name, type, 'YES'/'NO' nullable, key, default, extra).
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+# Not Inspector/MetaData.reflect(): the MySQL dialect reflects with a
+# SHOW CREATE TABLE per table and parses the DDL text
+_MYSQL_COLUMNS = text(
+    "SELECT c.TABLE_NAME, t.TABLE_ROWS, c.COLUMN_NAME, c.COLUMN_TYPE, c.IS_NULLABLE, "
+    "c.COLUMN_KEY, c.COLUMN_DEFAULT, c.EXTRA "
+    "FROM information_schema.COLUMNS c "
+    "JOIN information_schema.TABLES t "
+    "ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME "
+    "WHERE c.TABLE_SCHEMA = DATABASE() "
+    "ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION"
+)
+
+# pg_class.reltuples is the planner's row estimate (-1 before the first ANALYZE)
+_POSTGRESQL_COLUMNS = text(
+    "SELECT c.table_name, GREATEST(cl.reltuples, 0)::bigint, c.column_name, c.data_type, "
+    "c.is_nullable, '', c.column_default, '' "
+    "FROM information_schema.columns c "
+    "JOIN pg_class cl ON cl.oid = (quote_ident(c.table_schema) || '.' || quote_ident(c.table_name))::regclass "
+    "WHERE c.table_schema = current_schema() "
+    "ORDER BY c.table_name, c.ordinal_position"
+)
+
+# SQLite keeps no row estimate, so the count column is NULL
+_SQLITE_COLUMNS = text(
+    "SELECT m.name, NULL, p.name, p.type, CASE WHEN p.\"notnull\" THEN 'NO' ELSE 'YES' END, "
+    "CASE WHEN p.pk THEN 'PRI' ELSE '' END, p.dflt_value, '' "
+    "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+    "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' "
+    "ORDER BY m.name, p.cid"
+)
+
+_COLUMN_QUERIES = {
+    "mysql": _MYSQL_COLUMNS,
+    "postgresql": _POSTGRESQL_COLUMNS,
+    "sqlite": _SQLITE_COLUMNS,
+}
+
+
+def _dialect(connection) -> str:
+    name = connection.dialect.name
+    if name not in _COLUMN_QUERIES:
+        raise ValueError(f"Unsupported database dialect: {name}")
+    return name
+
+
+def server_info(connection) -> Dict[str, Optional[str]]:
+    """Server version, connected user, current database and SSL cipher"""
+    name = _dialect(connection)
+    if name == "mysql":
+        # The scalar functions share one round-trip; SHOW STATUS cannot join them
+        version, user, database = connection.execute(
+            text("SELECT VERSION(), USER(), DATABASE()")
+        ).one()
+        ssl_result = connection.execute(text("SHOW STATUS LIKE 'Ssl_cipher'")).fetchone()
+        ssl_cipher = ssl_result[1] if ssl_result else None
+    elif name == "postgresql":
+        version, user, database = connection.execute(
+            text("SELECT version(), current_user, current_database()")
+        ).one()
+        ssl_cipher = connection.execute(
+            text("SELECT cipher FROM pg_stat_ssl WHERE pid = pg_backend_pid()")
+        ).scalar()
+    else:
+        version = connection.execute(text("SELECT sqlite_version()")).scalar()
+        user, database, ssl_cipher = None, connection.engine.url.database, None
+
+    return {"version": version, "user": user, "database": database, "ssl_cipher": ssl_cipher or None}
+
+
+def describe_tables(connection) -> Tuple[Dict[str, List[list]], Dict[str, Optional[int]]]:
+    """Columns of every table, grouped by table name, plus approximate row counts
+
+    Row counts are the catalog's estimates (None where the database keeps
+    none). The rows are streamed and grouped as they arrive.
+    """
+    stmt = _COLUMN_QUERIES[_dialect(connection)].execution_options(stream_results=True, yield_per=200)
+
+    columns_by_table = defaultdict(list)
+    row_counts = {}
+    for table_name, table_rows, *column in connection.execute(stmt):
+        columns_by_table[table_name].append(column)
+        row_counts[table_name] = table_rows
+    return dict(columns_by_table), row_counts
+
+
+def schema_version(connection) -> Optional[Tuple[Any, ...]]:
+    """Cheap value that changes whenever the schema (or, on MySQL, its data) changes
+
+    None when the database has no such value; callers should not cache then.
+    """
+    name = _dialect(connection)
+    if name == "mysql":
+        return tuple(connection.execute(text(
+            "SELECT COUNT(*), MAX(CREATE_TIME), MAX(UPDATE_TIME) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE()"
+        )).one())
+    if name == "sqlite":
+        return (connection.execute(text("PRAGMA schema_version")).scalar(),)
+    return None
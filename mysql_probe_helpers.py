@@ -0,0 +1,62 @@
+"""
+Connection helpers shared by the Azure MySQL probe scripts
+
+The host, port, password and database come from SQLALCHEMY_DATABASE_URI;
+the CA bundle comes from MYSQL_SSL_CA, defaulting to the certificate
+shipped in app/certs.
+"""
+
+import functools
+import os
+import socket
+import ssl
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+CA_PATH = os.environ.get(
+    "MYSQL_SSL_CA",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "certs", "DigiCertGlobalRootG2.crt"),
+)
+
+# Fail fast while probing: unreachable hosts should not cost 30s per attempt
+PROBE_CONNECT_TIMEOUT = 5
+TCP_CHECK_TIMEOUT = 2
+
+@functools.lru_cache(maxsize=1)
+def db_settings():
+    """MySQL host, port, password and database from SQLALCHEMY_DATABASE_URI, parsed once per process"""
+    url = make_url(settings.SQLALCHEMY_DATABASE_URI)
+    return url.host, url.port or 3306, url.password, url.database
+
+@functools.lru_cache(maxsize=1)
+def ca_ssl_context():
+    """SSL context trusting CA_PATH, built once and shared by every probe.
+
+    The server certificate must chain to the CA and match the host name
+    connected to (Azure MySQL certificates carry the server FQDN).
+    """
+    context = ssl.create_default_context(cafile=CA_PATH)
+    context.check_hostname = True
+    return context
+
+def tcp_reachable(host, port):
+    """Check that the MySQL port accepts TCP connections before trying TLS/auth"""
+    try:
+        socket.create_connection((host, port), timeout=TCP_CHECK_TIMEOUT).close()
+        return True
+    except OSError as e:
+        print(f"   ❌ TCP connection to {host}:{port} failed: {e}")
+        return False
+
+def run_diag_query(connection) -> dict:
+    """Run the identity diagnostic query, keyed by the column names the mysql CLI prints"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT USER(), VERSION(), CONNECTION_ID()")
+        user, version, conn_id = cursor.fetchone()
+    return {"USER()": user, "VERSION()": version, "CONNECTION_ID()": conn_id}
+
+def format_cli_output(row: dict) -> list:
+    """Format a diagnostic row like the mysql CLI's batch-mode output"""
+    return ["\t".join(row), "\t".join(str(value) for value in row.values())]
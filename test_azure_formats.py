@@ -3,10 +3,40 @@
 Test different Azure MySQL username formats and connection methods
 """
 
+import json
 import pymysql
-import subprocess
-import os
-from app.core.config import settings
+from mysql_probe_helpers import (
+    PROBE_CONNECT_TIMEOUT,
+    db_settings,
+    format_cli_output,
+    run_diag_query,
+    tcp_reachable,
+)
+
+# Parse response bodies straight from bytes; orjson is optional
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# MySQL error code for a rejected credential
+ER_ACCESS_DENIED_ERROR = 1045
+
+# Failed probes for this run, keyed by (username, ssl_profile). Access-denied
+# failures are stored under ssl_profile=None: the server rejected the
+# credential itself, so retrying it with another SSL profile cannot succeed.
+_FAILED = {}
+
+def known_failure(username, ssl_profile):
+    """Return the cached error for a username/SSL profile that already failed, if any"""
+    return _FAILED.get((username, ssl_profile)) or _FAILED.get((username, None))
+
+def record_failure(username, ssl_profile, error):
+    """Remember a failed probe so later probes in this run can skip it"""
+    if isinstance(error, pymysql.err.OperationalError) and error.args[0] == ER_ACCESS_DENIED_ERROR:
+        ssl_profile = None
+    _FAILED[(username, ssl_profile)] = str(error)[:80]
 
 def test_username_formats():
     """Test different Azure MySQL username formats"""
@@ -15,10 +45,7 @@ def test_username_formats():
     print("=" * 60)
     
     # Get original settings
-    host = settings.MYSQL_HOST
-    port = settings.MYSQL_PORT
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    host, port, password, database = db_settings()
     
     # Extract server name from host
     server_name = host.split('.')[0]  # rdbs-002-gen10-step3-2-oshima2
@@ -37,10 +64,20 @@ def test_username_formats():
     print(f"📋 Server name extracted: {server_name}")
     print()
     
+    if not tcp_reachable(host, port):
+        print("❌ Server unreachable - skipping username format tests")
+        return None
+    
     for i, username in enumerate(username_formats, 1):
         print(f"🧪 Test {i}: Username format '{username}'")
         print("-" * 40)
         
+        cached_error = known_failure(username, "default")
+        if cached_error:
+            print(f"   ⏭️  Skipped (known failure: {cached_error})")
+            print()
+            continue
+        
         try:
             # Test PyMySQL connection
             connection = pymysql.connect(
@@ -50,7 +87,7 @@ def test_username_formats():
                 password=password,
                 database=database,
                 ssl_disabled=False,
-                connect_timeout=30
+                connect_timeout=PROBE_CONNECT_TIMEOUT
             )
             
             with connection.cursor() as cursor:
@@ -76,6 +113,7 @@ def test_username_formats():
             
         except Exception as e:
             print(f"   ❌ Failed: {str(e)}")
+            record_failure(username, "default", e)
         
         print()
     
@@ -83,15 +121,13 @@ def test_username_formats():
     return None
 
 def test_mysql_client_formats():
-    """Test different formats with MySQL command line client"""
+    """Test different formats with the MySQL command line client's SSL settings"""
     
     print("\n🔧 Testing MySQL Command Line Client Formats")
     print("=" * 60)
     
     # Get settings
-    host = settings.MYSQL_HOST
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    host, port, password, database = db_settings()
     server_name = host.split('.')[0]
     base_username = "tech0gen10student"
     
@@ -101,46 +137,47 @@ def test_mysql_client_formats():
         f"{base_username}@{host}",
     ]
     
-    mysql_client = "/opt/homebrew/opt/mysql-client@8.4/bin/mysql"
+    if not tcp_reachable(host, port):
+        print("❌ Server unreachable - skipping MySQL client tests")
+        return None
     
     for i, username in enumerate(username_formats, 1):
         print(f"🧪 MySQL Client Test {i}: '{username}'")
         print("-" * 40)
         
+        cached_error = known_failure(username, "required")
+        if cached_error:
+            print(f"   ⏭️  Skipped (known failure: {cached_error})")
+            print()
+            continue
+        
         try:
-            cmd = [
-                mysql_client,
-                "-h", host,
-                "-u", username,
-                f"-p{password}",
-                "-D", database,
-                "--ssl-mode=REQUIRED",
-                "-e", "SELECT USER() as current_user, VERSION() as version;"
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
+            # Equivalent of: mysql --ssl-mode=REQUIRED (encrypt, don't verify the server cert)
+            connection = pymysql.connect(
+                host=host,
+                port=port,
+                user=username,
+                password=password,
+                database=database,
+                ssl={"verify_mode": False},
+                connect_timeout=PROBE_CONNECT_TIMEOUT
             )
             
-            if result.returncode == 0:
-                print(f"   ✅ SUCCESS!")
-                print(f"   📊 Output:")
-                for line in result.stdout.strip().split('\n'):
-                    print(f"      {line}")
-                print()
-                print(f"🎉 WORKING MySQL CLIENT FORMAT: '{username}'")
-                return username
-            else:
-                print(f"   ❌ Failed:")
-                for line in result.stderr.strip().split('\n'):
-                    if line.strip():
-                        print(f"      {line}")
+            diag = run_diag_query(connection)
+            connection.close()
+            
+            print(f"   ✅ SUCCESS!")
+            print(f"   📊 Output:")
+            for line in format_cli_output(diag):
+                print(f"      {line}")
+            print()
+            print(f"🎉 WORKING MySQL CLIENT FORMAT: '{username}'")
+            return username
                         
         except Exception as e:
-            print(f"   ❌ Exception: {str(e)}")
+            print(f"   ❌ Failed:")
+            print(f"      {str(e)}")
+            record_failure(username, "required", e)
         
         print()
     
@@ -151,8 +188,7 @@ def get_current_ip():
     try:
         import urllib.request
         response = urllib.request.urlopen('https://httpbin.org/ip', timeout=10)
-        import json
-        data = json.loads(response.read().decode())
+        data = _loads(response.read())
         return data['origin']
     except:
         return "Unable to determine"
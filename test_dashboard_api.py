@@ -6,12 +6,83 @@ KPIと月次データが0以外で返ることを確認
 
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Parse response bodies straight from bytes; orjson is optional
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # API Base URLs
 BACKEND_BASE = "https://app-002-gen10-step3-2-py-oshima2.azurewebsites.net"
 FRONTEND_BASE = "https://app-002-gen10-step3-2-node-oshima2.azurewebsites.net"
 
+# (connect, read) timeouts - fail fast on unreachable hosts
+REQUEST_TIMEOUT = (3.05, 7)
+
+# Bytes of the dashboard page inspected for content detection
+FRONTEND_PREVIEW_BYTES = 4096
+
+# Bytes of an error body shown in failure messages
+ERROR_PREVIEW_BYTES = 128
+
+SESSION = requests.Session()
+
+def _preview(response, limit=ERROR_PREVIEW_BYTES):
+    """First bytes of a streamed response body, for error messages"""
+    try:
+        return next(response.iter_content(chunk_size=limit), b"").decode(errors="replace")
+    finally:
+        response.close()
+
+def _probe_endpoint(endpoint):
+    """Probe one backend endpoint and return its report lines"""
+    lines = []
+    log = lines.append
+    
+    url = f"{BACKEND_BASE}{endpoint}"
+    log(f"\n📡 Testing: {endpoint}")
+    
+    try:
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT, stream=True)
+        log(f"   Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            data = _loads(response.content)
+            log(f"   Response: {json.dumps(data, indent=2, default=str)[:200]}...")
+            
+            # Basic validation
+            if endpoint.endswith('/kpi'):
+                assert 'active_users' in data or 'total_users' in data
+                log(f"   ✅ KPI data structure OK")
+                
+            elif endpoint.endswith('/monthly-usage'):
+                assert isinstance(data, list) or 'months' in data
+                log(f"   ✅ Monthly usage data structure OK")
+                
+            elif endpoint.endswith('/co2-trend'):
+                assert isinstance(data, list) or 'points' in data  
+                log(f"   ✅ CO2 trend data structure OK")
+                
+        elif response.status_code == 401:
+            log(f"   ⚠️  Authentication required")
+        elif response.status_code == 403:
+            log(f"   ⚠️  Access forbidden")
+        else:
+            log(f"   ❌ Error: {_preview(response)}")
+        
+        response.close()
+            
+    except requests.exceptions.RequestException as e:
+        log(f"   ❌ Request failed: {e}")
+    except Exception as e:
+        log(f"   ❌ Test failed: {e}")
+    
+    return lines
+
 def test_backend_endpoints():
     """バックエンドAPIエンドポイントをテスト"""
     print("🔍 Backend API Tests")
@@ -24,42 +95,12 @@ def test_backend_endpoints():
         "/api/v1/metrics/co2-trend"
     ]
     
-    for endpoint in endpoints:
-        url = f"{BACKEND_BASE}{endpoint}"
-        print(f"\n📡 Testing: {endpoint}")
-        
-        try:
-            response = requests.get(url, timeout=10)
-            print(f"   Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"   Response: {json.dumps(data, indent=2, default=str)[:200]}...")
-                
-                # Basic validation
-                if endpoint.endswith('/kpi'):
-                    assert 'active_users' in data or 'total_users' in data
-                    print(f"   ✅ KPI data structure OK")
-                    
-                elif endpoint.endswith('/monthly-usage'):
-                    assert isinstance(data, list) or 'months' in data
-                    print(f"   ✅ Monthly usage data structure OK")
-                    
-                elif endpoint.endswith('/co2-trend'):
-                    assert isinstance(data, list) or 'points' in data  
-                    print(f"   ✅ CO2 trend data structure OK")
-                    
-            elif response.status_code == 401:
-                print(f"   ⚠️  Authentication required")
-            elif response.status_code == 403:
-                print(f"   ⚠️  Access forbidden")
-            else:
-                print(f"   ❌ Error: {response.text[:100]}")
-                
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ Request failed: {e}")
-        except Exception as e:
-            print(f"   ❌ Test failed: {e}")
+    # Endpoints are independent; probe them concurrently, report in order
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        reports = list(executor.map(_probe_endpoint, endpoints))
+    
+    for report in reports:
+        print("\n".join(report))
 
 def test_frontend_access():
     """フロントエンド接続可能性をテスト"""
@@ -67,19 +108,23 @@ def test_frontend_access():
     print("=" * 50)
     
     try:
-        response = requests.get(f"{FRONTEND_BASE}/dashboard", timeout=10)
-        print(f"Dashboard page status: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("✅ Dashboard page accessible")
-            # Check if it contains expected elements
-            content = response.text.lower()
-            if 'dashboard' in content:
-                print("✅ Dashboard content detected")
+        # Stream the page and only read the head of the HTML
+        response = SESSION.get(f"{FRONTEND_BASE}/dashboard", timeout=REQUEST_TIMEOUT, stream=True)
+        try:
+            print(f"Dashboard page status: {response.status_code}")
+            
+            if response.status_code == 200:
+                print("✅ Dashboard page accessible")
+                # Check if it contains expected elements
+                content = response.raw.read(FRONTEND_PREVIEW_BYTES, decode_content=True).lower()
+                if b'dashboard' in content:
+                    print("✅ Dashboard content detected")
+                else:
+                    print("⚠️  Dashboard content not found")
             else:
-                print("⚠️  Dashboard content not found")
-        else:
-            print(f"❌ Dashboard page error: {response.status_code}")
+                print(f"❌ Dashboard page error: {response.status_code}")
+        finally:
+            response.close()
             
     except requests.exceptions.RequestException as e:
         print(f"❌ Frontend access failed: {e}")
@@ -94,10 +139,12 @@ def test_database_health():
     print("   Check Azure App Service logs for connection status")
 
 def main():
+    started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
     print(f"🚀 Dashboard API Test Suite")
     print(f"Backend: {BACKEND_BASE}")
     print(f"Frontend: {FRONTEND_BASE}")
-    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Time: {started_at}")
     
     test_backend_endpoints()
     test_frontend_access()
@@ -2,20 +2,53 @@
 """
 Unit tests for metrics API endpoints
 Tests all four metrics endpoints with various scenarios
+
+Run as a script, or under pytest (endpoint tests can be distributed with
+pytest-xdist: pytest -n 4 test_metrics_api.py)
 """
 
+import pytest
 import requests
 import json
-from datetime import date, datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Parse response bodies straight from bytes; orjson is optional
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # Configuration
 API_BASE = "http://localhost:8000/api/v1"
+URL_LOGIN = f"{API_BASE}/login/access-token"
+URL_KPI = f"{API_BASE}/metrics/kpi"
+URL_MONTHLY_USAGE = f"{API_BASE}/metrics/monthly-usage"
+URL_CO2_TREND = f"{API_BASE}/metrics/co2-trend"
+URL_YOY_USAGE = f"{API_BASE}/metrics/yoy-usage"
 TEST_USER = {
     "username": "admin@example.com",
     "password": "StrongP@ssw0rd!"
 }
 
+# Shared keep-alive session, sized for the concurrent endpoint tests
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=8))
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=8))
+
+PARALLEL_WORKERS = 4
+
+# Bytes of an error body shown in failure messages
+ERROR_PREVIEW_BYTES = 128
+
+def _preview(response, limit=ERROR_PREVIEW_BYTES):
+    """First bytes of a streamed response body, for error messages"""
+    try:
+        return next(response.iter_content(chunk_size=limit), b"").decode(errors="replace")
+    finally:
+        response.close()
+
 def get_auth_token():
     """Get authentication token for testing"""
     print("🔐 Getting authentication token...")
@@ -25,152 +58,201 @@ def get_auth_token():
         "password": TEST_USER["password"]
     }
     
-    response = requests.post(
-        f"{API_BASE}/login/access-token",
+    response = SESSION.post(
+        URL_LOGIN,
         data=login_data,
-        headers={"Content-Type": "application/x-www-form-urlencoded"}
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        stream=True
     )
     
     if response.status_code == 200:
-        token = response.json()["access_token"]
+        token = _loads(response.content)["access_token"]
         print(f"✅ Authentication successful")
         return token
     else:
-        print(f"❌ Login failed: {response.status_code} - {response.text}")
+        print(f"❌ Login failed: {response.status_code} - {_preview(response)}")
         return None
 
-def test_kpi_endpoint(headers):
-    """Test KPI metrics endpoint"""
-    print("\n📊 Testing KPI metrics endpoint...")
+@pytest.fixture(scope="session")
+def auth_headers():
+    """Bearer headers shared by every endpoint test in the session (one login per xdist worker)"""
+    try:
+        token = get_auth_token()
+    except requests.exceptions.RequestException as e:
+        pytest.skip(f"API not reachable: {e}")
+    if not token:
+        pytest.skip("Cannot authenticate against the API")
+    return {"Authorization": f"Bearer {token}"}
+
+def check_kpi_endpoint(headers):
+    """KPI metrics endpoint; returns (ok, report lines)"""
+    report = ["\n📊 Testing KPI metrics endpoint..."]
     
     # Test default parameters
-    response = requests.get(f"{API_BASE}/metrics/kpi", headers=headers)
-    print(f"Status: {response.status_code}")
+    response = SESSION.get(URL_KPI, headers=headers, stream=True)
+    report.append(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
-        print(f"✅ KPI endpoint working")
-        print(f"   Company ID: {data.get('company_id')}")
-        print(f"   Active Users: {data.get('active_users')}")
-        print(f"   Electricity Total: {data.get('electricity_total_kwh')} kWh")
-        print(f"   Gas Total: {data.get('gas_total_m3')} m³")
-        print(f"   CO2 Reduction: {data.get('co2_reduction_total_kg')} kg")
-        return True
-    else:
-        print(f"❌ KPI endpoint failed: {response.text}")
-        return False
+        data = _loads(response.content)
+        report.append(f"✅ KPI endpoint working")
+        report.append(f"   Company ID: {data.get('company_id')}")
+        report.append(f"   Active Users: {data.get('active_users')}")
+        report.append(f"   Electricity Total: {data.get('electricity_total_kwh')} kWh")
+        report.append(f"   Gas Total: {data.get('gas_total_m3')} m³")
+        report.append(f"   CO2 Reduction: {data.get('co2_reduction_total_kg')} kg")
+        return True, report
+    
+    report.append(f"❌ KPI endpoint failed ({response.status_code}): {_preview(response)}")
+    return False, report
 
-def test_monthly_usage_endpoint(headers):
-    """Test monthly usage endpoint"""
-    print("\n📈 Testing monthly usage endpoint...")
+def check_monthly_usage_endpoint(headers):
+    """Monthly usage endpoint; returns (ok, report lines)"""
+    report = ["\n📈 Testing monthly usage endpoint..."]
     
     current_year = datetime.now().year
-    response = requests.get(
-        f"{API_BASE}/metrics/monthly-usage",
+    response = SESSION.get(
+        URL_MONTHLY_USAGE,
         params={"year": current_year},
-        headers=headers
+        headers=headers,
+        stream=True
     )
-    print(f"Status: {response.status_code}")
+    report.append(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
-        print(f"✅ Monthly usage endpoint working")
-        print(f"   Company ID: {data.get('company_id')}")
-        print(f"   Year: {data.get('year')}")
-        print(f"   Months data: {len(data.get('months', []))} entries")
+        data = _loads(response.content)
+        report.append(f"✅ Monthly usage endpoint working")
+        report.append(f"   Company ID: {data.get('company_id')}")
+        report.append(f"   Year: {data.get('year')}")
+        report.append(f"   Months data: {len(data.get('months', []))} entries")
         
         # Show sample month data
         if data.get('months'):
             sample_month = data['months'][0]
-            print(f"   Sample (Month {sample_month.get('month')}): "
-                  f"{sample_month.get('electricity_kwh')} kWh, "
-                  f"{sample_month.get('gas_m3')} m³")
-        return True
-    else:
-        print(f"❌ Monthly usage endpoint failed: {response.text}")
-        return False
+            report.append(f"   Sample (Month {sample_month.get('month')}): "
+                          f"{sample_month.get('electricity_kwh')} kWh, "
+                          f"{sample_month.get('gas_m3')} m³")
+        return True, report
+    
+    report.append(f"❌ Monthly usage endpoint failed ({response.status_code}): {_preview(response)}")
+    return False, report
 
-def test_co2_trend_endpoint(headers):
-    """Test CO2 trend endpoint"""
-    print("\n📉 Testing CO2 trend endpoint...")
+def check_co2_trend_endpoint(headers):
+    """CO2 trend endpoint; returns (ok, report lines)"""
+    report = ["\n📉 Testing CO2 trend endpoint..."]
     
-    response = requests.get(
-        f"{API_BASE}/metrics/co2-trend",
+    response = SESSION.get(
+        URL_CO2_TREND,
         params={"interval": "month"},
-        headers=headers
+        headers=headers,
+        stream=True
     )
-    print(f"Status: {response.status_code}")
+    report.append(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
-        print(f"✅ CO2 trend endpoint working")
-        print(f"   Company ID: {data.get('company_id')}")
-        print(f"   Data Points: {len(data.get('points', []))} entries")
+        data = _loads(response.content)
+        report.append(f"✅ CO2 trend endpoint working")
+        report.append(f"   Company ID: {data.get('company_id')}")
+        report.append(f"   Data Points: {len(data.get('points', []))} entries")
         
         # Show sample data point
         if data.get('points'):
             sample_point = data['points'][0]
-            print(f"   Sample: {sample_point.get('period')} - {sample_point.get('co2_kg')} kg CO2")
-        return True
-    else:
-        print(f"❌ CO2 trend endpoint failed: {response.text}")
-        return False
+            report.append(f"   Sample: {sample_point.get('period')} - {sample_point.get('co2_kg')} kg CO2")
+        return True, report
+    
+    report.append(f"❌ CO2 trend endpoint failed ({response.status_code}): {_preview(response)}")
+    return False, report
 
-def test_yoy_usage_endpoint(headers):
-    """Test year-over-year usage endpoint"""
-    print("\n📊 Testing year-over-year usage endpoint...")
+def check_yoy_usage_endpoint(headers):
+    """Year-over-year usage endpoint; returns (ok, report lines)"""
+    report = ["\n📊 Testing year-over-year usage endpoint..."]
     
     current_month = datetime.now().strftime("%Y-%m")
-    response = requests.get(
-        f"{API_BASE}/metrics/yoy-usage",
+    response = SESSION.get(
+        URL_YOY_USAGE,
         params={"month": current_month},
-        headers=headers
+        headers=headers,
+        stream=True
     )
-    print(f"Status: {response.status_code}")
+    report.append(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
-        print(f"✅ YoY usage endpoint working")
-        print(f"   Company ID: {data.get('company_id')}")
-        print(f"   Month: {data.get('month')}")
+        data = _loads(response.content)
+        report.append(f"✅ YoY usage endpoint working")
+        report.append(f"   Company ID: {data.get('company_id')}")
+        report.append(f"   Month: {data.get('month')}")
         
         current = data.get('current', {})
         previous = data.get('previous', {})
         delta = data.get('delta', {})
         
-        print(f"   Current: {current.get('electricity_kwh')} kWh, {current.get('gas_m3')} m³")
-        print(f"   Previous: {previous.get('electricity_kwh')} kWh, {previous.get('gas_m3')} m³")
-        print(f"   Delta: {delta.get('electricity_kwh')} kWh, {delta.get('gas_m3')} m³")
-        return True
-    else:
-        print(f"❌ YoY usage endpoint failed: {response.text}")
-        return False
+        report.append(f"   Current: {current.get('electricity_kwh')} kWh, {current.get('gas_m3')} m³")
+        report.append(f"   Previous: {previous.get('electricity_kwh')} kWh, {previous.get('gas_m3')} m³")
+        report.append(f"   Delta: {delta.get('electricity_kwh')} kWh, {delta.get('gas_m3')} m³")
+        return True, report
+    
+    report.append(f"❌ YoY usage endpoint failed ({response.status_code}): {_preview(response)}")
+    return False, report
 
-def test_error_scenarios(headers):
-    """Test error scenarios"""
-    print("\n⚠️ Testing error scenarios...")
+def check_error_scenarios(headers):
+    """Error scenarios; reported only, never failing; returns (ok, report lines)"""
+    report = ["\n⚠️ Testing error scenarios..."]
     
     # Test invalid company access
-    response = requests.get(
-        f"{API_BASE}/metrics/kpi",
+    response = SESSION.get(
+        URL_KPI,
         params={"company_id": 999},  # Non-existent company
         headers=headers
     )
     
     if response.status_code == 403:
-        print("✅ Proper access control - forbidden company access rejected")
+        report.append("✅ Proper access control - forbidden company access rejected")
     else:
-        print(f"❌ Access control failed: {response.status_code}")
+        report.append(f"❌ Access control failed: {response.status_code}")
     
     # Test invalid date ranges
-    response = requests.get(
-        f"{API_BASE}/metrics/kpi",
+    response = SESSION.get(
+        URL_KPI,
         params={"from_date": "2025-12-31", "to_date": "2025-01-01"},  # Invalid range
         headers=headers
     )
     
-    print(f"   Invalid date range test: {response.status_code}")
-    return True
+    report.append(f"   Invalid date range test: {response.status_code}")
+    return True, report
+
+def _run_check(check, headers):
+    """Run one check under pytest: print its report, fail on a failed check"""
+    ok, report = check(headers)
+    print("\n".join(report))
+    if not ok:
+        pytest.fail(report[-1])
+
+def test_kpi_endpoint(auth_headers):
+    """Test KPI metrics endpoint"""
+    _run_check(check_kpi_endpoint, auth_headers)
+
+def test_monthly_usage_endpoint(auth_headers):
+    """Test monthly usage endpoint"""
+    _run_check(check_monthly_usage_endpoint, auth_headers)
+
+def test_co2_trend_endpoint(auth_headers):
+    """Test CO2 trend endpoint"""
+    _run_check(check_co2_trend_endpoint, auth_headers)
+
+def test_yoy_usage_endpoint(auth_headers):
+    """Test year-over-year usage endpoint"""
+    _run_check(check_yoy_usage_endpoint, auth_headers)
+
+def test_error_scenarios(auth_headers):
+    """Test error scenarios"""
+    _run_check(check_error_scenarios, auth_headers)
+
+def _safe(check, headers):
+    """Run one check, turning exceptions into a failed result with a report line"""
+    try:
+        return check(headers)
+    except Exception as e:
+        return False, [f"❌ Test {check.__name__} failed with exception: {e}"]
 
 def run_all_tests():
     """Run all metrics API tests"""
@@ -185,23 +267,27 @@ def run_all_tests():
     
     headers = {"Authorization": f"Bearer {token}"}
     
-    # Run all endpoint tests
-    tests = [
-        test_kpi_endpoint,
-        test_monthly_usage_endpoint,
-        test_co2_trend_endpoint,
-        test_yoy_usage_endpoint,
-        test_error_scenarios
+    # Independent read-only endpoint checks run concurrently; the error
+    # scenarios check access control and stay sequential afterwards
+    parallel_checks = [
+        check_kpi_endpoint,
+        check_monthly_usage_endpoint,
+        check_co2_trend_endpoint,
+        check_yoy_usage_endpoint
     ]
+    serial_checks = [
+        check_error_scenarios
+    ]
+    
+    # Workers only collect report lines; they are printed here, in order
+    with ThreadPoolExecutor(max_workers=PARALLEL_WORKERS) as executor:
+        outcomes = list(executor.map(lambda check: _safe(check, headers), parallel_checks))
+    outcomes.extend(_safe(check, headers) for check in serial_checks)
     
     results = []
-    for test_func in tests:
-        try:
-            result = test_func(headers)
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Test {test_func.__name__} failed with exception: {e}")
-            results.append(False)
+    for ok, report in outcomes:
+        print("\n".join(report))
+        results.append(ok)
     
     # Summary
     passed = sum(results)
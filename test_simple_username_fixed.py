@@ -3,9 +3,10 @@
 Test simple username format with fixed SQL syntax
 """
 
+import io
+import os
 import pymysql
-import subprocess
-from app.core.config import settings
+from mysql_probe_helpers import ca_ssl_context, db_settings, format_cli_output, run_diag_query
 
 def test_simple_username_fixed():
     """Test simple username with corrected SQL queries"""
@@ -13,10 +14,7 @@ def test_simple_username_fixed():
     print("🔐 Testing Simple Username with Fixed SQL")
     print("=" * 50)
     
-    host = settings.MYSQL_HOST
-    port = settings.MYSQL_PORT
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    host, port, password, database = db_settings()
     
     # Simple username without @server suffix
     username = "tech0gen10student"
@@ -36,28 +34,20 @@ def test_simple_username_fixed():
             user=username,
             password=password,
             database=database,
-            ssl_ca="/Users/tanakatsuyoshi/Desktop/アプリ開発/step3-2_BtoB_backend/app/certs/DigiCertGlobalRootG2.crt",
+            ssl=ca_ssl_context(),
             ssl_disabled=False,
             connect_timeout=30
         )
         
+        diag = run_diag_query(connection)
+        
         with connection.cursor() as cursor:
-            # Fixed SQL queries
-            cursor.execute("SELECT USER()")
-            user_info = cursor.fetchone()
-            
-            cursor.execute("SELECT VERSION()")
-            version = cursor.fetchone()
-            
             cursor.execute("SELECT DATABASE()")
             current_db = cursor.fetchone()
             
             cursor.execute("SHOW STATUS LIKE 'Ssl_cipher'")
             ssl_status = cursor.fetchone()
             
-            cursor.execute("SELECT CONNECTION_ID()")
-            conn_id = cursor.fetchone()
-            
             # Test a simple table query
             cursor.execute("SHOW TABLES")
             tables = cursor.fetchall()
@@ -65,11 +55,11 @@ def test_simple_username_fixed():
         connection.close()
         
         print(f"   ✅ CONNECTION SUCCESSFUL!")
-        print(f"   👤 Connected as: {user_info[0]}")
-        print(f"   📊 MySQL Version: {version[0]}")
+        print(f"   👤 Connected as: {diag['USER()']}")
+        print(f"   📊 MySQL Version: {diag['VERSION()']}")
         print(f"   📂 Database: {current_db[0]}")
         print(f"   🔐 SSL Cipher: {ssl_status[1] if ssl_status and ssl_status[1] else 'Not active'}")
-        print(f"   🔗 Connection ID: {conn_id[0]}")
+        print(f"   🔗 Connection ID: {diag['CONNECTION_ID()']}")
         print(f"   📋 Available tables: {len(tables)} tables found")
         for table in tables:
             print(f"      - {table[0]}")
@@ -86,54 +76,41 @@ def test_simple_username_fixed():
         return False
 
 def test_mysql_client_fixed():
-    """Test with MySQL client using fixed syntax"""
+    """Test with the mysql CLI's connection settings (SSL required), run in-process"""
     
-    print("\n🔧 Testing MySQL Client with Fixed Syntax")
+    print("\n🔧 Testing MySQL Client Settings with Fixed Syntax")
     print("=" * 50)
     
-    host = settings.MYSQL_HOST
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    host, port, password, database = db_settings()
     username = "tech0gen10student"
     
-    mysql_client = "/opt/homebrew/opt/mysql-client@8.4/bin/mysql"
-    
     print(f"🧪 MySQL Client Test: '{username}' with SSL")
     print("-" * 40)
     
     try:
-        cmd = [
-            mysql_client,
-            "-h", host,
-            "-u", username,
-            f"-p{password}",
-            "-D", database,
-            "--ssl-mode=REQUIRED",
-            "--ssl-ca=/Users/tanakatsuyoshi/Desktop/アプリ開発/step3-2_BtoB_backend/app/certs/DigiCertGlobalRootG2.crt",
-            "-e", "SELECT USER(), VERSION(), CONNECTION_ID();"
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
+        # Equivalent of: mysql --ssl-mode=REQUIRED --ssl-ca=CA_PATH, without forking the CLI
+        connection = pymysql.connect(
+            host=host,
+            port=port,
+            user=username,
+            password=password,
+            database=database,
+            ssl=ca_ssl_context(),
+            connect_timeout=30
         )
         
-        if result.returncode == 0:
-            print(f"   ✅ SUCCESS!")
-            print(f"   📊 Output:")
-            for line in result.stdout.strip().split('\n'):
-                print(f"      {line}")
-            return True
-        else:
-            print(f"   ❌ Failed:")
-            for line in result.stderr.strip().split('\n'):
-                if line.strip():
-                    print(f"      {line}")
+        diag = run_diag_query(connection)
+        connection.close()
+        
+        print(f"   ✅ SUCCESS!")
+        print(f"   📊 Output:")
+        for line in format_cli_output(diag):
+            print(f"      {line}")
+        return True
                     
     except Exception as e:
-        print(f"   ❌ Exception: {str(e)}")
+        print(f"   ❌ Failed:")
+        print(f"      {str(e)}")
     
     return False
 
@@ -145,22 +122,20 @@ def update_env_file():
     
     env_path = "/Users/tanakatsuyoshi/Desktop/アプリ開発/step3-2_BtoB_backend/.env"
     
-    # Read current .env
+    # Rewrite in a single pass, then atomically swap the file in place
+    buffer = io.StringIO()
     with open(env_path, 'r') as f:
-        lines = f.readlines()
-    
-    # Update MYSQL_USER line
-    updated_lines = []
-    for line in lines:
-        if line.strip().startswith('MYSQL_USER='):
-            updated_lines.append('MYSQL_USER=tech0gen10student\n')
-            print(f"   ✅ Updated: MYSQL_USER=tech0gen10student")
-        else:
-            updated_lines.append(line)
-    
-    # Write back to .env
-    with open(env_path, 'w') as f:
-        f.writelines(updated_lines)
+        for line in f:
+            if line.strip().startswith('MYSQL_USER='):
+                buffer.write('MYSQL_USER=tech0gen10student\n')
+                print(f"   ✅ Updated: MYSQL_USER=tech0gen10student")
+            else:
+                buffer.write(line)
+    
+    tmp_path = env_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, env_path)
     
     print("   📁 .env file updated successfully")
 
@@ -182,7 +157,7 @@ if __name__ == "__main__":
         print(f"4. 🔄 Ready to test SQLAlchemy connection")
         print(f"5. 🔄 Ready to run Alembic migrations")
     else:
-        # Test MySQL client as fallback
+        # Test MySQL client settings as fallback
         mysql_success = test_mysql_client_fixed()
         
         if mysql_success:
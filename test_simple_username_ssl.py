@@ -3,9 +3,28 @@
 Test simple username format with proper SSL configuration
 """
 
+import contextlib
 import pymysql
-import ssl
-from app.core.config import settings
+from mysql_probe_helpers import (
+    PROBE_CONNECT_TIMEOUT,
+    ca_ssl_context,
+    db_settings,
+    format_cli_output,
+    run_diag_query,
+    tcp_reachable,
+)
+
+def _run_ssl_diag(connection) -> dict:
+    """Identity diagnostics plus the current database and negotiated SSL cipher"""
+    diag = run_diag_query(connection)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT DATABASE()")
+        diag["DATABASE()"] = cursor.fetchone()[0]
+        
+        cursor.execute("SHOW STATUS LIKE 'Ssl_cipher'")
+        ssl_status = cursor.fetchone()
+        diag["Ssl_cipher"] = ssl_status[1] if ssl_status else None
+    return diag
 
 def test_simple_username_with_ssl():
     """Test simple username format with various SSL configurations"""
@@ -13,10 +32,7 @@ def test_simple_username_with_ssl():
     print("🔐 Testing Simple Username with SSL")
     print("=" * 50)
     
-    host = settings.MYSQL_HOST
-    port = settings.MYSQL_PORT
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    host, port, password, database = db_settings()
     
     # Simple username without @server suffix
     username = "tech0gen10student"
@@ -26,12 +42,16 @@ def test_simple_username_with_ssl():
     print(f"📋 Database: {database}")
     print()
     
+    if not tcp_reachable(host, port):
+        print("❌ Server unreachable - skipping SSL configuration tests")
+        return False
+    
     # SSL configurations to test
     ssl_configs = [
         {
             "name": "SSL with certificate verification",
             "config": {
-                "ssl_ca": "/Users/tanakatsuyoshi/Desktop/アプリ開発/step3-2_BtoB_backend/app/certs/DigiCertGlobalRootG2.crt",
+                "ssl": ca_ssl_context,
                 "ssl_disabled": False
             }
         },
@@ -51,111 +71,91 @@ def test_simple_username_with_ssl():
         }
     ]
     
+    common = {
+        "host": host,
+        "port": port,
+        "user": username,
+        "password": password,
+        "database": database,
+        "connect_timeout": PROBE_CONNECT_TIMEOUT,
+    }
+    
+    # The configs only differ client-side, so the first one that connects
+    # is enough; the diagnostics run once on that connection
     for ssl_config in ssl_configs:
         print(f"🧪 Testing: {ssl_config['name']}")
         print("-" * 40)
         
         try:
-            connection = pymysql.connect(
-                host=host,
-                port=port,
-                user=username,
-                password=password,
-                database=database,
-                connect_timeout=30,
-                **ssl_config['config']
-            )
-            
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT USER() as current_user")
-                user_info = cursor.fetchone()
-                
-                cursor.execute("SELECT VERSION() as version")
-                version = cursor.fetchone()
-                
-                cursor.execute("SELECT DATABASE() as current_db")
-                current_db = cursor.fetchone()
-                
-                cursor.execute("SHOW STATUS LIKE 'Ssl_cipher'")
-                ssl_status = cursor.fetchone()
-                
-                cursor.execute("SELECT CONNECTION_ID() as connection_id")
-                conn_id = cursor.fetchone()
-            
-            connection.close()
-            
-            print(f"   ✅ SUCCESS!")
-            print(f"   👤 Connected as: {user_info[0]}")
-            print(f"   📊 MySQL Version: {version[0]}")
-            print(f"   📂 Database: {current_db[0]}")
-            print(f"   🔐 SSL Cipher: {ssl_status[1] if ssl_status and ssl_status[1] else 'Not active'}")
-            print(f"   🔗 Connection ID: {conn_id[0]}")
-            print()
-            print(f"🎉 WORKING CONFIGURATION FOUND!")
-            print(f"✅ Username: '{username}'")
-            print(f"✅ SSL Config: {ssl_config['name']}")
-            
-            return True
-            
+            # Shared SSL contexts are built on first use, so a bad CA path
+            # only fails the config that needs it
+            options = {key: value() if callable(value) else value
+                       for key, value in ssl_config['config'].items()}
+            connection = pymysql.connect(**common, **options)
         except Exception as e:
             print(f"   ❌ Failed: {str(e)}")
+            print()
+            continue
         
+        try:
+            with contextlib.closing(connection):
+                diag = _run_ssl_diag(connection)
+        except Exception as e:
+            print(f"   ❌ Connected, but diagnostics failed: {str(e)}")
+            return False
+
+        print(f"   ✅ SUCCESS!")
+        print(f"   👤 Connected as: {diag['USER()']}")
+        print(f"   📊 MySQL Version: {diag['VERSION()']}")
+        print(f"   📂 Database: {diag['DATABASE()']}")
+        print(f"   🔐 SSL Cipher: {diag['Ssl_cipher'] or 'Not active'}")
+        print(f"   🔗 Connection ID: {diag['CONNECTION_ID()']}")
         print()
+        print(f"🎉 WORKING CONFIGURATION FOUND!")
+        print(f"✅ Username: '{username}'")
+        print(f"✅ SSL Config: {ssl_config['name']}")
+        
+        return True
     
     return False
 
 def test_mysql_client_simple_username():
-    """Test simple username with MySQL client"""
+    """Test simple username with the MySQL client's SSL settings, run in-process"""
     
     print("🔧 Testing Simple Username with MySQL Client")
     print("=" * 50)
     
-    import subprocess
-    
-    host = settings.MYSQL_HOST
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    host, port, password, database = db_settings()
     username = "tech0gen10student"
     
-    mysql_client = "/opt/homebrew/opt/mysql-client@8.4/bin/mysql"
-    
     # Test with SSL required
     print(f"🧪 MySQL Client Test: '{username}' with SSL")
     print("-" * 40)
     
     try:
-        cmd = [
-            mysql_client,
-            "-h", host,
-            "-u", username,
-            f"-p{password}",
-            "-D", database,
-            "--ssl-mode=REQUIRED",
-            "--ssl-ca=/Users/tanakatsuyoshi/Desktop/アプリ開発/step3-2_BtoB_backend/app/certs/DigiCertGlobalRootG2.crt",
-            "-e", "SELECT USER() as current_user, VERSION() as version, CONNECTION_ID() as conn_id;"
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
+        # Equivalent of: mysql --ssl-mode=REQUIRED --ssl-ca=CA_PATH, without forking the CLI
+        connection = pymysql.connect(
+            host=host,
+            port=port,
+            user=username,
+            password=password,
+            database=database,
+            ssl=ca_ssl_context(),
+            connect_timeout=PROBE_CONNECT_TIMEOUT
         )
         
-        if result.returncode == 0:
-            print(f"   ✅ SUCCESS!")
-            print(f"   📊 Output:")
-            for line in result.stdout.strip().split('\n'):
-                print(f"      {line}")
-            return True
-        else:
-            print(f"   ❌ Failed:")
-            for line in result.stderr.strip().split('\n'):
-                if line.strip():
-                    print(f"      {line}")
+        diag = run_diag_query(connection)
+        connection.close()
+        
+        print(f"   ✅ SUCCESS!")
+        print(f"   📊 Output:")
+        for line in format_cli_output(diag):
+            print(f"      {line}")
+        return True
                     
     except Exception as e:
-        print(f"   ❌ Exception: {str(e)}")
+        print(f"   ❌ Failed:")
+        print(f"      {str(e)}")
     
     return False
 
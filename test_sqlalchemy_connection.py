@@ -3,9 +3,27 @@
 Test SQLAlchemy connection with corrected username
 """
 
-from sqlalchemy import create_engine, text
+import json
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from app.core.config import settings
-from app.db.database import engine as app_engine
+from app.db.database import engine as app_engine, SessionLocal
+
+# Everything the connection check reports, fetched in a single round-trip
+DIAGNOSTIC_QUERY = text("""
+    SELECT
+        1 AS test,
+        VERSION() AS version,
+        (SELECT VARIABLE_VALUE FROM performance_schema.session_status
+         WHERE VARIABLE_NAME = 'Ssl_cipher') AS ssl_cipher,
+        USER() AS current_user_name,
+        DATABASE() AS current_db,
+        (SELECT JSON_ARRAYAGG(table_name) FROM information_schema.tables
+         WHERE table_schema = DATABASE()) AS tables
+""")
+
+SESSION_QUERY = text("SELECT 1 AS test, USER() AS current_user_name, DATABASE() AS current_db")
 
 def test_sqlalchemy_connection():
     """Test SQLAlchemy connection using the app configuration"""
@@ -19,31 +37,18 @@ def test_sqlalchemy_connection():
     
     try:
         with app_engine.connect() as conn:
-            # Test basic connectivity
-            result = conn.execute(text("SELECT 1 as test")).fetchone()
-            print(f"   ✅ Basic connectivity: {result[0]}")
-            
-            # Get version
-            version_result = conn.execute(text("SELECT VERSION() as version")).fetchone()
-            print(f"   📊 MySQL Version: {version_result[0]}")
-            
-            # Check SSL status
-            ssl_result = conn.execute(text("SHOW STATUS LIKE 'Ssl_cipher'")).fetchone()
-            print(f"   🔐 SSL Cipher: {ssl_result[1] if ssl_result and ssl_result[1] else 'Not active'}")
-            
-            # Check current user
-            user_result = conn.execute(text("SELECT USER() as current_user")).fetchone()
-            print(f"   👤 Connected as: {user_result[0]}")
-            
-            # Check current database
-            db_result = conn.execute(text("SELECT DATABASE() as current_db")).fetchone()
-            print(f"   📂 Current database: {db_result[0]}")
-            
-            # Check existing tables
-            tables_result = conn.execute(text("SHOW TABLES")).fetchall()
-            print(f"   📋 Existing tables: {len(tables_result)} found")
-            for table in tables_result:
-                print(f"      - {table[0]}")
+            diag = conn.execute(DIAGNOSTIC_QUERY).mappings().one()
+        
+        tables = sorted(json.loads(diag["tables"])) if diag["tables"] else []
+        
+        print(f"   ✅ Basic connectivity: {diag['test']}")
+        print(f"   📊 MySQL Version: {diag['version']}")
+        print(f"   🔐 SSL Cipher: {diag['ssl_cipher'] or 'Not active'}")
+        print(f"   👤 Connected as: {diag['current_user_name']}")
+        print(f"   📂 Current database: {diag['current_db']}")
+        print(f"   📋 Existing tables: {len(tables)} found")
+        for table in tables:
+            print(f"      - {table}")
         
         print("   ✅ SQLAlchemy connection successful!")
         return True
@@ -59,31 +64,29 @@ def test_database_url_generation():
     print("=" * 50)
     
     try:
-        db_url = settings.get_database_url()
-        # Mask password for display
-        if settings.MYSQL_PASSWORD:
-            masked_url = db_url.replace(settings.MYSQL_PASSWORD, '***')
-        else:
-            masked_url = db_url
+        url = make_url(settings.get_database_url())
+        print(f"   📋 Generated URL: {url.render_as_string(hide_password=True)}")
         
-        print(f"   📋 Generated URL: {masked_url}")
+        # The generated URL may only swap the driver (MYSQL_DRIVER); every
+        # other component must come straight from SQLALCHEMY_DATABASE_URI
+        configured = make_url(settings.SQLALCHEMY_DATABASE_URI.strip())
+        mismatches = [
+            f"{name}={getattr(url, name)!r} (expected {getattr(configured, name)!r})"
+            for name in ("host", "port", "username", "database")
+            if getattr(url, name) != getattr(configured, name)
+        ]
+        if not (url.host and url.database and url.get_driver_name()):
+            mismatches.append("host, database and driver must all be set")
+        if mismatches:
+            print(f"   ❌ URL components do not match settings: {', '.join(mismatches)}")
+            return False
+        print(f"   ✅ URL components match settings")
         
-        # Test creating engine with generated URL
-        test_engine = create_engine(
-            db_url,
-            pool_pre_ping=True,
-            pool_recycle=300,
-            connect_args={
-                "charset": "utf8mb4",
-                "connect_timeout": 60,
-            }
-        )
-        
-        with test_engine.connect() as conn:
+        # Connectivity goes through the application's engine pool
+        with app_engine.connect() as conn:
             result = conn.execute(text("SELECT 1")).fetchone()
-            print(f"   ✅ Engine creation and connection successful: {result[0]}")
+            print(f"   ✅ Connection through application engine successful: {result[0]}")
         
-        test_engine.dispose()
         return True
         
     except Exception as e:
@@ -97,21 +100,15 @@ def test_session_creation():
     print("=" * 50)
     
     try:
-        from app.db.database import SessionLocal
-        
-        # Create a session
+        # SessionLocal is bound to the application engine, so this reuses
+        # the pooled connection from the earlier tests
         db = SessionLocal()
         
-        # Test basic query
-        result = db.execute(text("SELECT 1 as test")).fetchone()
-        print(f"   ✅ Session query successful: {result[0]}")
-        
-        # Test connection info
-        user_result = db.execute(text("SELECT USER()")).fetchone()
-        print(f"   👤 Session user: {user_result[0]}")
-        
-        db_result = db.execute(text("SELECT DATABASE()")).fetchone()
-        print(f"   📂 Session database: {db_result[0]}")
+        # Test basic query and connection info in one round-trip
+        result = db.execute(SESSION_QUERY).mappings().one()
+        print(f"   ✅ Session query successful: {result['test']}")
+        print(f"   👤 Session user: {result['current_user_name']}")
+        print(f"   📂 Session database: {result['current_db']}")
         
         db.close()
         print("   ✅ Session creation and cleanup successful!")
@@ -125,12 +122,13 @@ if __name__ == "__main__":
     print("🚀 SQLAlchemy Connection Test Suite")
     print("=" * 60)
     
+    url = make_url(settings.get_database_url())
     print(f"📋 Configuration Summary:")
-    print(f"   MySQL Host: {settings.MYSQL_HOST}")
-    print(f"   MySQL Port: {settings.MYSQL_PORT}")
-    print(f"   MySQL User: {settings.MYSQL_USER}")
-    print(f"   MySQL Database: {settings.MYSQL_DATABASE}")
-    print(f"   SSL Certificate: {settings.MYSQL_SSL_CA}")
+    print(f"   MySQL Host: {url.host}")
+    print(f"   MySQL Port: {url.port or 3306}")
+    print(f"   MySQL User: {url.username}")
+    print(f"   MySQL Database: {url.database}")
+    print(f"   SSL Certificate: {url.query.get('ssl_ca', 'not set in URL')}")
     print()
     
     # Test SQLAlchemy connection
@@ -6,10 +6,102 @@ Tests multiple SSL configurations to find working connection method
 
 import pymysql
 import ssl
-import os
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from mysql_probe_helpers import CA_PATH
+
+# Ssl_cipher from the session status, so each probe needs a single round-trip
+SSL_CIPHER_SUBQUERY = (
+    "(SELECT VARIABLE_VALUE FROM performance_schema.session_status "
+    "WHERE VARIABLE_NAME = 'Ssl_cipher')"
+)
+PROBE_QUERY = f"SELECT VERSION(), {SSL_CIPHER_SUBQUERY}, DATABASE()"
+ENGINE_PROBE_QUERY = text(f"SELECT 1, VERSION(), {SSL_CIPHER_SUBQUERY}")
+
+def _skip_param(value):
+    return None
+
+# PyMySQL connect() SSL kwargs -> URL query parameters (None: leave out)
+_SSL_URL_ENCODERS = {
+    "ssl_cert_reqs": lambda value: "ssl_cert_reqs=CERT_NONE" if value == ssl.CERT_NONE else None,
+    "ssl_verify_cert": lambda value: "ssl_verify_cert=false" if not value else None,
+    "ssl_verify_identity": lambda value: "ssl_verify_identity=false" if not value else None,
+    "ssl_ca": lambda value: f"ssl_ca={value}" if value else None,
+    "ssl_disabled": lambda value: f"ssl_disabled={str(value).lower()}",
+}
+
+def probe_pymysql(config, params):
+    """Try one SSL configuration with PyMySQL; returns (ok, report lines)"""
+    report = []
+    
+    try:
+        # Test PyMySQL direct connection
+        connection = pymysql.connect(**params, **config['ssl'])
+        
+        with connection.cursor() as cursor:
+            cursor.execute(PROBE_QUERY)
+            version, ssl_cipher, current_db = cursor.fetchone()
+        
+        connection.close()
+        
+        report.append(f"   ✅ Connection successful!")
+        report.append(f"   📊 MySQL Version: {version}")
+        report.append(f"   🔐 SSL Status: {ssl_cipher or 'Not active'}")
+        report.append(f"   📂 Database: {current_db}")
+        return True, report
+        
+    except Exception as e:
+        report.append(f"   ❌ Connection failed: {str(e)}")
+        return False, report
+
+def probe_sqlalchemy(config, base_url, password):
+    """Connect through SQLAlchemy with a configuration PyMySQL accepted; returns report lines"""
+    report = []
+    
+    try:
+        # Add SSL parameters to URL
+        ssl_params = [
+            param
+            for key, value in config['ssl'].items()
+            if (param := _SSL_URL_ENCODERS.get(key, _skip_param)(value))
+        ]
+        
+        if ssl_params:
+            db_url = base_url + "?" + "&".join(ssl_params)
+        else:
+            db_url = base_url
+        
+        report.append(f"   📋 Connection URL: {db_url.replace(password, '***')}")
+        
+        # Test SQLAlchemy connection; the engine is used once, so skip
+        # pooling and the pre-ping round-trip
+        engine = create_engine(
+            db_url,
+            poolclass=NullPool,
+            connect_args={
+                "charset": "utf8mb4",
+                "connect_timeout": 60,
+            }
+        )
+        
+        with engine.connect() as conn:
+            result, version, ssl_cipher = conn.execute(ENGINE_PROBE_QUERY).one()
+        
+        report.append(f"   ✅ SQLAlchemy connection successful!")
+        report.append(f"   📊 Test query result: {result}")
+        report.append(f"   📊 MySQL Version: {version}")
+        report.append(f"   🔐 SSL Cipher: {ssl_cipher or 'Not active'}")
+        
+        engine.dispose()
+        
+    except Exception as e:
+        report.append(f"   ❌ SQLAlchemy connection failed: {str(e)}")
+    
+    return report
 
 def test_ssl_configurations():
     """Test different SSL configurations for Azure MySQL"""
@@ -18,11 +110,12 @@ def test_ssl_configurations():
     print("=" * 60)
     
     # Get connection parameters
-    host = settings.MYSQL_HOST
-    port = settings.MYSQL_PORT
-    user = settings.MYSQL_USER
-    password = settings.MYSQL_PASSWORD
-    database = settings.MYSQL_DATABASE
+    url = make_url(settings.SQLALCHEMY_DATABASE_URI)
+    host = url.host
+    port = url.port or 3306
+    user = url.username
+    password = url.password
+    database = url.database
     
     print(f"📋 Connection Parameters:")
     print(f"   Host: {host}")
@@ -36,7 +129,7 @@ def test_ssl_configurations():
         {
             "name": "1. SSL Required with Certificate Verification",
             "ssl": {
-                "ssl_ca": "/Users/tanakatsuyoshi/Desktop/アプリ開発/step3-2_BtoB_backend/app/certs/DigiCertGlobalRootG2.crt",
+                "ssl_ca": CA_PATH,
                 "ssl_disabled": False
             }
         },
@@ -69,108 +162,49 @@ def test_ssl_configurations():
         }
     ]
     
-    successful_configs = []
+    params = {
+        "host": host,
+        "port": port,
+        "user": user,
+        "password": password,
+        "database": database,
+    }
     
-    for config in configurations:
+    # Probes are independent and I/O-bound: overlap the handshakes, then
+    # report in configuration order from the main thread
+    with ThreadPoolExecutor(max_workers=len(configurations)) as executor:
+        results = list(executor.map(lambda config: probe_pymysql(config, params), configurations))
+    
+    successful_configs = []
+    for config, (ok, report) in zip(configurations, results):
         print(f"🧪 Testing: {config['name']}")
         print("-" * 50)
+        for line in report:
+            print(line)
+        print()
         
-        try:
-            # Test PyMySQL direct connection
-            connection = pymysql.connect(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                database=database,
-                **config['ssl']
-            )
-            
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT VERSION() as version")
-                version = cursor.fetchone()
-                
-                cursor.execute("SHOW STATUS LIKE 'Ssl_cipher'")
-                ssl_status = cursor.fetchone()
-                
-                cursor.execute("SELECT DATABASE() as current_db")
-                current_db = cursor.fetchone()
-            
-            connection.close()
-            
-            print(f"   ✅ Connection successful!")
-            print(f"   📊 MySQL Version: {version[0]}")
-            print(f"   🔐 SSL Status: {ssl_status[1] if ssl_status and ssl_status[1] else 'Not active'}")
-            print(f"   📂 Database: {current_db[0]}")
-            
+        if ok:
             successful_configs.append(config)
-            
-        except Exception as e:
-            print(f"   ❌ Connection failed: {str(e)}")
-        
-        print()
     
     # Test SQLAlchemy with successful configurations
     if successful_configs:
         print("🔧 Testing SQLAlchemy with successful configurations")
         print("=" * 60)
         
-        for config in successful_configs:
+        # Invariant across configurations: encode the password and build the base URL once
+        encoded_password = quote_plus(password)
+        base_url = f"mysql+pymysql://{user}:{encoded_password}@{host}:{port}/{database}"
+        
+        with ThreadPoolExecutor(max_workers=len(successful_configs)) as executor:
+            results = list(executor.map(
+                lambda config: probe_sqlalchemy(config, base_url, password), successful_configs
+            ))
+        
+        for config, report in zip(successful_configs, results):
             print(f"🧪 SQLAlchemy Test: {config['name']}")
             print("-" * 50)
-            
-            try:
-                # Build connection URL with SSL parameters
-                encoded_password = quote_plus(password)
-                base_url = f"mysql+pymysql://{user}:{encoded_password}@{host}:{port}/{database}"
-                
-                # Add SSL parameters to URL
-                ssl_params = []
-                for key, value in config['ssl'].items():
-                    if key == 'ssl_cert_reqs' and value == ssl.CERT_NONE:
-                        ssl_params.append("ssl_cert_reqs=CERT_NONE")
-                    elif key == 'ssl_verify_cert' and not value:
-                        ssl_params.append("ssl_verify_cert=false")
-                    elif key == 'ssl_verify_identity' and not value:
-                        ssl_params.append("ssl_verify_identity=false")
-                    elif key == 'ssl_ca' and value:
-                        ssl_params.append(f"ssl_ca={value}")
-                    elif key == 'ssl_disabled':
-                        ssl_params.append(f"ssl_disabled={str(value).lower()}")
-                
-                if ssl_params:
-                    db_url = base_url + "?" + "&".join(ssl_params)
-                else:
-                    db_url = base_url
-                
-                print(f"   📋 Connection URL: {db_url.replace(password, '***')}")
-                
-                # Test SQLAlchemy connection
-                engine = create_engine(
-                    db_url,
-                    pool_pre_ping=True,
-                    pool_recycle=300,
-                    connect_args={
-                        "charset": "utf8mb4",
-                        "connect_timeout": 60,
-                    }
-                )
-                
-                with engine.connect() as conn:
-                    result = conn.execute(text("SELECT 1 as test")).fetchone()
-                    version_result = conn.execute(text("SELECT VERSION() as version")).fetchone()
-                    ssl_result = conn.execute(text("SHOW STATUS LIKE 'Ssl_cipher'")).fetchone()
-                
-                print(f"   ✅ SQLAlchemy connection successful!")
-                print(f"   📊 Test query result: {result[0]}")
-                print(f"   📊 MySQL Version: {version_result[0]}")
-                print(f"   🔐 SSL Cipher: {ssl_result[1] if ssl_result and ssl_result[1] else 'Not active'}")
-                
-                engine.dispose()
-                
-            except Exception as e:
-                print(f"   ❌ SQLAlchemy connection failed: {str(e)}")
-            
+            for line in report:
+                print(line)
             print()
     
     else:
@@ -0,0 +1,5 @@
+def pytest_configure(config):
+    # Registered here too so the marker is known when pytest-xdist isn't installed
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run tests with the same group name on the same xdist worker"
+    )
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the energy record creation endpoint
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.api.v1.endpoints import energy_records
+from app.schemas.energy_record import EnergyRecordCreate
+
+@pytest.fixture
+def record_in():
+    return EnergyRecordCreate(device_id=1, timestamp=datetime(2025, 1, 1), energy_consumed=12.5)
+
+@pytest.fixture
+def current_user():
+    return SimpleNamespace(id=7)
+
+@pytest.fixture(autouse=True)
+def owned_device(monkeypatch, current_user):
+    """The posted device exists and belongs to current_user"""
+    device = SimpleNamespace(id=1, owner_id=current_user.id)
+    monkeypatch.setattr(energy_records.device_service, "get", lambda db, id: device)
+
+def test_duplicate_reading_returns_409(monkeypatch, record_in, current_user):
+    """A second reading for the same device and timestamp is a conflict, not a server error"""
+    def create_with_user(db, obj_in, user_id):
+        raise IntegrityError("INSERT INTO energy_records", {}, Exception("Duplicate entry"))
+    monkeypatch.setattr(energy_records.energy_record_service, "create_with_user", create_with_user)
+
+    with pytest.raises(HTTPException) as exc_info:
+        energy_records.create_energy_record(db=None, record_in=record_in, current_user=current_user)
+
+    assert exc_info.value.status_code == 409
+
+def test_new_reading_is_returned(monkeypatch, record_in, current_user):
+    """A reading without a conflict is created for the current user"""
+    created = SimpleNamespace(id=1)
+    calls = []
+    def create_with_user(db, obj_in, user_id):
+        calls.append((obj_in, user_id))
+        return created
+    monkeypatch.setattr(energy_records.energy_record_service, "create_with_user", create_with_user)
+
+    result = energy_records.create_energy_record(db=None, record_in=record_in, current_user=current_user)
+
+    assert result is created
+    assert calls == [(record_in, current_user.id)]
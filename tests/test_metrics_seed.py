@@ -7,6 +7,7 @@ import pytest
 import sys
 import os
 from datetime import datetime
+from types import SimpleNamespace
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -16,6 +17,37 @@ from tools.seed.seed_config import config
 from tools.seed.seed_api import APISeedClient, get_current_api_metrics
 from tools.seed.seed_db import get_database_metrics
 
+USER_FIELDS = {'email', 'password', 'full_name', 'department', 'employee_code', 'is_active'}
+
+@pytest.fixture(scope="session")
+def users_summary():
+    """Everything the user-data tests check, gathered in one pass over the users"""
+    users = config.get_users_data()
+    emails = set()
+    codes = set()
+    active = 0
+    incomplete = []
+    foreign_emails = []
+    
+    for user in users:
+        if not USER_FIELDS <= user.keys():
+            incomplete.append(user)
+            continue
+        emails.add(user['email'])
+        codes.add(user['employee_code'])
+        active += user['is_active']
+        if '@scope3holdings.co.jp' not in user['email']:
+            foreign_emails.append(user['email'])
+    
+    return SimpleNamespace(
+        users=users,
+        emails=emails,
+        codes=codes,
+        active=active,
+        incomplete=incomplete,
+        foreign_emails=foreign_emails
+    )
+
 class TestMetricsSeed:
     """Test metrics seeding functionality"""
     
@@ -40,24 +72,14 @@ class TestMetricsSeed:
         assert len(co2_data) == 12
         assert all(x > 0 for x in co2_data)
     
-    def test_users_data_generation(self):
+    def test_users_data_generation(self, users_summary):
         """Test user data generation"""
-        users_data = config.get_users_data()
-        
-        assert len(users_data) == config.user_count
-        
-        for user_data in users_data:
-            assert 'email' in user_data
-            assert '@scope3holdings.co.jp' in user_data['email']
-            assert 'password' in user_data
-            assert 'full_name' in user_data
-            assert 'department' in user_data
-            assert 'employee_code' in user_data
-            assert 'is_active' in user_data
+        assert len(users_summary.users) == config.user_count
+        assert users_summary.incomplete == []
+        assert users_summary.foreign_emails == []
         
         # Check that correct number of active users
-        active_count = sum(1 for user in users_data if user['is_active'])
-        assert active_count == config.active_user_count
+        assert users_summary.active == config.active_user_count
     
     def test_point_data_generation(self):
         """Test point data generation"""
@@ -116,6 +138,7 @@ class TestMetricsSeed:
         assert client.session is not None
         assert client.admin_token is None  # Not authenticated yet
     
+    @pytest.mark.xdist_group("net")
     @pytest.mark.asyncio
     async def test_metrics_api_structure(self):
         """Test that metrics API returns expected structure"""
@@ -137,6 +160,7 @@ class TestMetricsSeed:
             # API might not be accessible in test environment
             pytest.skip("API not accessible in test environment")
     
+    @pytest.mark.xdist_group("net")
     def test_database_metrics_structure(self):
         """Test database metrics return expected structure"""
         try:
@@ -218,19 +242,13 @@ class TestSeedValidation:
             # Points should be between 50-1000 per month
             assert 50 <= points <= 1000
     
-    def test_no_duplicate_emails(self):
+    def test_no_duplicate_emails(self, users_summary):
         """Test that user emails are unique"""
-        users_data = config.get_users_data()
-        emails = [user['email'] for user in users_data]
-        
-        assert len(emails) == len(set(emails))  # No duplicates
+        assert len(users_summary.emails) == len(users_summary.users)  # No duplicates
     
-    def test_no_duplicate_employee_codes(self):
+    def test_no_duplicate_employee_codes(self, users_summary):
         """Test that employee codes are unique"""
-        users_data = config.get_users_data()
-        codes = [user['employee_code'] for user in users_data]
-        
-        assert len(codes) == len(set(codes))  # No duplicates
+        assert len(users_summary.codes) == len(users_summary.users)  # No duplicates
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -4,7 +4,9 @@ Consolidated seed runner with idempotency
 """
 
 import sys
+import operator
 import os
+import random
 import time
 from datetime import datetime
 from typing import Dict, Any
@@ -23,6 +25,15 @@ except ImportError:
     from seed_api import seed_users_via_api, verify_api_endpoints, get_current_api_metrics
     from seed_db import seed_database_direct, get_database_metrics
 
+# KPI fields that must be non-zero for the dashboards to show data
+REQUIRED_KPI_FIELDS = ('active_users', 'electricity_total_kwh', 'gas_total_m3', 'co2_reduction_total_kg')
+_KPI_DEFAULTS = dict.fromkeys(REQUIRED_KPI_FIELDS, 0)
+_get_kpi_values = operator.itemgetter(*REQUIRED_KPI_FIELDS)
+
+def _kpi_values(metrics: Dict[str, Any]) -> tuple:
+    """Values of REQUIRED_KPI_FIELDS, in order, with 0 for missing fields"""
+    return _get_kpi_values({**_KPI_DEFAULTS, **metrics})
+
 class SeedRunner:
     """Main seed runner with comprehensive orchestration"""
     
@@ -44,6 +55,14 @@ class SeedRunner:
         print("=" * 60)
         
         try:
+            # Re-runs against an already seeded environment have nothing to do
+            if os.getenv('SEED_FORCE') != '1' and self._already_seeded():
+                print("\n⏭️ Environment already seeded, skipping all steps (set SEED_FORCE=1 to reseed)")
+                for step in self.results:
+                    self.results[step] = True
+                self._print_final_summary()
+                return True
+            
             # Step 1: Seed users via API
             print("\n📋 Step 1: API-based user seeding")
             self.results['api_seeding'] = self._run_api_seeding()
@@ -75,9 +94,23 @@ class SeedRunner:
             print(f"❌ Seeding process failed: {e}")
             return False
     
+    def _already_seeded(self) -> bool:
+        """Whether the API already reports fully populated KPI metrics"""
+        try:
+            metrics = get_current_api_metrics()
+        except Exception:
+            return False
+        
+        values = _kpi_values(metrics)
+        return all(value > 0 for value in values) and values[0] >= config.active_user_count
+    
     def _run_api_seeding(self) -> bool:
         """Run API-based seeding with retry logic"""
         max_retries = 3
+        # Decorrelated-jitter backoff: quick first retry, and concurrent
+        # runners do not hit the auth endpoint in lockstep
+        base, cap = 0.5, 30.0
+        delay = base
         
         for attempt in range(1, max_retries + 1):
             print(f"  Attempt {attempt}/{max_retries}: Creating users via API...")
@@ -95,8 +128,9 @@ class SeedRunner:
                 print(f"  ❌ API seeding attempt {attempt} error: {e}")
             
             if attempt < max_retries:
-                print(f"  ⏳ Waiting 5 seconds before retry...")
-                time.sleep(5)
+                delay = random.uniform(base, min(cap, delay * 3))
+                print(f"  ⏳ Waiting {delay:.1f} seconds before retry...")
+                time.sleep(delay)
         
         print("  ⚠️ API seeding failed after all retries (continuing with database fallback)")
         return False
@@ -191,12 +225,9 @@ class SeedRunner:
     
     def _check_kpi_metrics(self, metrics: Dict[str, Any]) -> bool:
         """Check if KPI metrics are populated with meaningful data"""
-        required_fields = ['active_users', 'electricity_total_kwh', 'gas_total_m3', 'co2_reduction_total_kg']
-        
         populated_count = 0
         
-        for field in required_fields:
-            value = metrics.get(field, 0)
+        for field, value in zip(REQUIRED_KPI_FIELDS, _kpi_values(metrics)):
             is_populated = value > 0
             
             status_icon = "✅" if is_populated else "❌"
@@ -249,6 +280,11 @@ class SeedRunner:
 
 def main():
     """Main entry point"""
+    # Progress output is line-buffered even when piped to a log forwarder,
+    # so step headers and retry messages show up while a step is running
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=True)
+    
     runner = SeedRunner()
     success = runner.run_complete_seeding()
     
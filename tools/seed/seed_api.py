@@ -3,27 +3,142 @@
 API-based seeding for user and energy data
 """
 
+import base64
+import functools
+import os
+import random
 import requests
+import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Tuple, Any
+from requests.adapters import HTTPAdapter
 try:
     from .seed_config import config
 except ImportError:
     from seed_config import config
 
+# (De)serialize request and response bodies as bytes; orjson is optional
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# Retries for a user creation request that failed transiently
+# (connection error, 429 or 5xx); other 4xx responses fail fast
+CREATE_RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+# Page size for the one-off user list fetch that primes the email index
+USER_LIST_LIMIT = 1000
+# Users per POST /api/v1/users/bulk request; the server accepts at most
+# MAX_BULK_USERS (25) because it hashes every password inside the request
+BULK_BATCH_SIZE = 25
+
+# Admin token reused across runs while it has this many seconds left
+TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'seed_token.json')
+TOKEN_EXPIRY_MARGIN = 60
+
+def _is_retriable(status_code: int) -> bool:
+    """Whether a failed response is worth retrying"""
+    return status_code == 429 or status_code >= 500
+
+def _token_exp(token: str) -> Optional[float]:
+    """Read the exp claim from a JWT payload (no signature check)"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(_loads(base64.urlsafe_b64decode(payload))['exp'])
+    except Exception:
+        return None
+
+def _load_cached_token() -> Optional[str]:
+    """Admin token cached for this API and admin by an earlier run, if still valid"""
+    try:
+        with open(TOKEN_CACHE_PATH, 'rb') as f:
+            cached = _loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    if cached.get('base_url') != config.api_base_url or cached.get('email') != config.admin_email:
+        return None
+    if (cached.get('exp') or 0) <= time.time() + TOKEN_EXPIRY_MARGIN:
+        return None
+    return cached.get('token')
+
+def _save_cached_token(token: str) -> None:
+    """Cache the admin token (owner-readable only) for later runs"""
+    exp = _token_exp(token)
+    if exp is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+        fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_dumps({'base_url': config.api_base_url, 'email': config.admin_email,
+                            'token': token, 'exp': exp}))
+    except OSError:
+        pass
+
+def _clear_cached_token() -> None:
+    """Forget a cached admin token the server rejected"""
+    try:
+        os.remove(TOKEN_CACHE_PATH)
+    except OSError:
+        pass
+
 class APISeedClient:
     """Client for seeding data via API"""
     
     def __init__(self):
         self.base_url = config.api_base_url
+        self._login_url = f"{self.base_url}/api/v1/login/access-token"
+        self._users_url = f"{self.base_url}/api/v1/users/"
+        self._users_bulk_url = f"{self.base_url}/api/v1/users/bulk"
+        self._kpi_url = f"{self.base_url}/api/v1/metrics/kpi"
+        # Endpoints checked by verify_metrics_apis()
+        self._metrics_urls = {
+            'kpi': self._kpi_url,
+            'monthly_usage': f"{self.base_url}/api/v1/metrics/monthly-usage?year={config.current_year}",
+            'co2_trend': f"{self.base_url}/api/v1/metrics/co2-trend?interval=month",
+            'yoy_usage': f"{self.base_url}/api/v1/metrics/yoy-usage?month={config.current_year}-{config.current_month:02d}"
+        }
         self.session = requests.Session()
         self.session.timeout = 30
+        # Sized to the request concurrency so every worker keeps its own
+        # keep-alive connection
+        adapter = HTTPAdapter(pool_connections=config.api_concurrency,
+                              pool_maxsize=config.api_concurrency, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.admin_token: Optional[str] = None
+        # Token restored from TOKEN_CACHE_PATH, if any
+        self._cached_token: Optional[str] = None
+        self._auth_lock = threading.Lock()
+        self.session.hooks['response'].append(self._refresh_on_unauthorized)
+        self._user_index: Dict[str, Dict[str, Any]] = {}
+        self._user_index_primed = False
+        # KPI body from the last successful verify_metrics_apis() run
+        self.kpi_metrics: Optional[Dict[str, Any]] = None
+        
+    def authenticate_admin(self, use_cache: bool = True) -> bool:
+        """Authenticate as admin and store token
+        
+        A token cached by an earlier run is reused while it is not about to expire.
+        """
+        if use_cache:
+            cached_token = _load_cached_token()
+            if cached_token:
+                self.admin_token = self._cached_token = cached_token
+                print("✅ Admin authentication reused from token cache")
+                return True
         
-    def authenticate_admin(self) -> bool:
-        """Authenticate as admin and store token"""
         try:
             print("🔐 Authenticating as admin...")
             
@@ -33,14 +148,15 @@ class APISeedClient:
             }
             
             response = self.session.post(
-                f"{self.base_url}/api/v1/login/access-token",
+                self._login_url,
                 headers={'Content-Type': 'application/x-www-form-urlencoded'},
                 data=login_data
             )
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = _loads(response.content)
                 self.admin_token = token_data['access_token']
+                _save_cached_token(self.admin_token)
                 print(f"✅ Admin authentication successful")
                 return True
             else:
@@ -52,6 +168,24 @@ class APISeedClient:
             print(f"❌ Authentication error: {e}")
             return False
     
+    def _refresh_on_unauthorized(self, response: requests.Response, **kwargs) -> requests.Response:
+        """Log in again and resend once when a token restored from the cache is rejected"""
+        if response.status_code != 401 or self._cached_token is None:
+            return response
+        if response.request.headers.get('Authorization') != f'Bearer {self._cached_token}':
+            return response
+        
+        with self._auth_lock:
+            # Another worker may have logged in again already
+            if self.admin_token == self._cached_token:
+                _clear_cached_token()
+                if not self.authenticate_admin(use_cache=False):
+                    return response
+        
+        request = response.request.copy()
+        request.headers['Authorization'] = f'Bearer {self.admin_token}'
+        return self.session.send(request, **kwargs)
+    
     def _get_auth_headers(self) -> Dict[str, str]:
         """Get authentication headers"""
         if not self.admin_token:
@@ -62,6 +196,17 @@ class APISeedClient:
             'Content-Type': 'application/json'
         }
     
+    @staticmethod
+    def _create_payload(user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Request body for creating a user from seed config data"""
+        return {
+            'email': user_data['email'],
+            'password': user_data['password'],
+            'full_name': user_data['full_name'],
+            'is_active': user_data['is_active'],
+            'is_superuser': False
+        }
+    
     def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create a user via API"""
         try:
@@ -72,22 +217,33 @@ class APISeedClient:
                 return existing_user
             
             # Create new user
-            create_data = {
-                'email': user_data['email'],
-                'password': user_data['password'],
-                'full_name': user_data['full_name'],
-                'is_active': user_data['is_active'],
-                'is_superuser': False
-            }
+            create_data = self._create_payload(user_data)
             
-            response = self.session.post(
-                f"{self.base_url}/api/v1/users/",
-                headers=self._get_auth_headers(),
-                json=create_data
-            )
+            delay = RETRY_BASE_DELAY
+            for attempt in range(CREATE_RETRIES + 1):
+                response = None
+                try:
+                    response = self.session.post(
+                        self._users_url,
+                        headers=self._get_auth_headers(),
+                        data=_dumps(create_data)
+                    )
+                except requests.ConnectionError:
+                    if attempt == CREATE_RETRIES:
+                        raise
+                else:
+                    if not _is_retriable(response.status_code) or attempt == CREATE_RETRIES:
+                        break
+                
+                # Decorrelated-jitter backoff, unless the server says how long to wait
+                delay = random.uniform(RETRY_BASE_DELAY, min(RETRY_MAX_DELAY, delay * 3))
+                retry_after = response.headers.get('Retry-After') if response is not None else None
+                time.sleep(float(retry_after) if retry_after and retry_after.isdigit() else delay)
             
             if response.status_code in [200, 201]:
-                user_info = response.json()
+                user_info = _loads(response.content)
+                # Keep the index consistent for later lookups in this run
+                self._user_index[user_data['email']] = user_info
                 print(f"✅ User created: {user_data['email']} (ID: {user_info.get('id')})")
                 return user_info
             else:
@@ -100,40 +256,97 @@ class APISeedClient:
             return None
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        """Get user by email (if endpoint exists)"""
+        """Get user by email from the user list fetched by _prime_user_cache()"""
+        if not self._user_index_primed:
+            self._prime_user_cache()
+        return self._user_index.get(email)
+    
+    def _prime_user_cache(self) -> None:
+        """Fetch the user list once (if the endpoint exists) and index it by email"""
+        # A failed fetch is not retried per lookup either
+        self._user_index_primed = True
         try:
-            # Try to get user list and find by email
             response = self.session.get(
-                f"{self.base_url}/api/v1/users/",
-                headers=self._get_auth_headers()
+                self._users_url,
+                headers=self._get_auth_headers(),
+                params={'limit': USER_LIST_LIMIT}
             )
             
             if response.status_code == 200:
-                users = response.json()
-                for user in users:
-                    if user.get('email') == email:
-                        return user
+                self._user_index.update((user.get('email'), user) for user in _loads(response.content))
+                
+        except Exception:
+            # If users endpoint doesn't exist or fails, the server's duplicate
+            # check on create is the only existence check
+            pass
+    
+    def create_users_bulk(self, users_data: List[Dict[str, Any]]) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+        """Create users through the bulk endpoint, one request per BULK_BATCH_SIZE users.
+        
+        Each request is committed by the server as a single transaction, so
+        this is the path that groups user writes; the per-user fallback
+        commits once per user.
+        
+        Returns the created users and the emails the server skipped as already
+        registered, or None when the server has no bulk endpoint (404/405) or a
+        batch fails, so the caller can fall back to per-user creation.
+        """
+        created_users = []
+        conflicts = []
+        for start in range(0, len(users_data), BULK_BATCH_SIZE):
+            batch = [self._create_payload(user_data)
+                     for user_data in users_data[start:start + BULK_BATCH_SIZE]]
             
-            return None
+            try:
+                response = self.session.post(
+                    self._users_bulk_url,
+                    headers=self._get_auth_headers(),
+                    data=_dumps(batch)
+                )
+            except Exception as e:
+                print(f"⚠️ Bulk user creation error: {e}")
+                return None
             
-        except Exception:
-            # If users endpoint doesn't exist or fails, return None
-            return None
+            if response.status_code in [404, 405]:
+                print("ℹ️ Bulk user endpoint not available, creating users one by one")
+                return None
+            if response.status_code not in [200, 201]:
+                print(f"⚠️ Bulk user creation failed: {response.status_code}")
+                return None
+            
+            result = _loads(response.content)
+            created_users.extend(result['created'])
+            conflicts.extend(result['conflicts'])
+        
+        return created_users, conflicts
     
     def create_users_batch(self, users_data: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
-        """Create multiple users"""
+        """Create multiple users, in bulk when the server supports it"""
         print(f"👥 Creating {len(users_data)} users...")
         
-        created_users = []
-        for i, user_data in enumerate(users_data, 1):
+        bulk_result = self.create_users_bulk(users_data)
+        if bulk_result is not None:
+            created, conflicts = bulk_result
+            self._user_index.update((user['email'], user) for user in created)
+            print(f"✅ Created {len(created)}/{len(users_data)} users (bulk)")
+            if conflicts:
+                print(f"ℹ️ {len(conflicts)} users already exist")
+            # Existing users resolve through the user list, as in create_user
+            return [self._user_index.get(user_data['email']) or self.get_user_by_email(user_data['email'])
+                    for user_data in users_data]
+        
+        # Prime before fanning out so the workers never race to fetch the list
+        if not self._user_index_primed:
+            self._prime_user_cache()
+        
+        def create(indexed_user):
+            i, user_data = indexed_user
             print(f"Creating user {i}/{len(users_data)}: {user_data['email']}")
-            
-            user = self.create_user(user_data)
-            created_users.append(user)
-            
-            # Brief delay to avoid rate limiting
-            if i < len(users_data):
-                time.sleep(0.5)
+            return self.create_user(user_data)
+        
+        # Requests share the session's connection pool; results keep input order
+        with ThreadPoolExecutor(max_workers=config.api_concurrency) as executor:
+            created_users = list(executor.map(create, enumerate(users_data, 1)))
         
         success_count = len([u for u in created_users if u is not None])
         print(f"✅ Created {success_count}/{len(users_data)} users")
@@ -144,45 +357,59 @@ class APISeedClient:
         """Verify that metrics APIs are accessible"""
         print("🔍 Verifying metrics APIs...")
         
-        endpoints = {
-            'kpi': '/api/v1/metrics/kpi',
-            'monthly_usage': f'/api/v1/metrics/monthly-usage?year={config.current_year}',
-            'co2_trend': '/api/v1/metrics/co2-trend?interval=month',
-            'yoy_usage': f'/api/v1/metrics/yoy-usage?month={config.current_year}-{config.current_month:02d}'
-        }
+        endpoints = self._metrics_urls
+        # Never let a KPI body fetched before seeding stand in for this check
+        self.kpi_metrics = None
         
-        results = {}
+        # The endpoints are independent reads, so fetch them all at once
+        statuses = {}
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            futures = {
+                executor.submit(self.session.get, url, headers=self._get_auth_headers()): name
+                for name, url in endpoints.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    response = future.result()
+                    statuses[name] = response.status_code
+                    # Keep the KPI body so get_current_metrics() need not fetch it again
+                    if name == 'kpi' and response.status_code == 200:
+                        self.kpi_metrics = _loads(response.content)
+                except Exception as e:
+                    statuses[name] = e
         
-        for name, endpoint in endpoints.items():
-            try:
-                response = self.session.get(
-                    f"{self.base_url}{endpoint}",
-                    headers=self._get_auth_headers()
-                )
-                
-                results[name] = response.status_code == 200
-                
-                if response.status_code == 200:
-                    print(f"✅ {name}: 200 OK")
-                else:
-                    print(f"❌ {name}: {response.status_code}")
-                    
-            except Exception as e:
-                print(f"❌ {name}: Error - {e}")
-                results[name] = False
+        results = {}
+        for name in endpoints:
+            status = statuses[name]
+            results[name] = status == 200
+            
+            if status == 200:
+                print(f"✅ {name}: 200 OK")
+            elif isinstance(status, Exception):
+                print(f"❌ {name}: Error - {status}")
+            else:
+                print(f"❌ {name}: {status}")
         
         return results
     
-    def get_current_metrics(self) -> Dict[str, Any]:
-        """Get current metrics data for verification"""
+    def get_current_metrics(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get current metrics data for verification
+        
+        Reuses the KPI body fetched by verify_metrics_apis() unless refresh is set.
+        """
+        if self.kpi_metrics is not None and not refresh:
+            return self.kpi_metrics
+        
         try:
             response = self.session.get(
-                f"{self.base_url}/api/v1/metrics/kpi",
+                self._kpi_url,
                 headers=self._get_auth_headers()
             )
             
             if response.status_code == 200:
-                return response.json()
+                self.kpi_metrics = _loads(response.content)
+                return self.kpi_metrics
             else:
                 return {}
                 
@@ -199,7 +426,7 @@ class APISeedClient:
             }
             
             response = self.session.post(
-                f"{self.base_url}/api/v1/login/access-token",
+                self._login_url,
                 headers={'Content-Type': 'application/x-www-form-urlencoded'},
                 data=login_data
             )
@@ -213,9 +440,18 @@ class APISeedClient:
         """Verify that created users can authenticate"""
         print("🔍 Verifying user authentication...")
         
+        sample = users_data[:5]  # Test first 5 users
+        
+        # Logins are independent, so run them together and report in order
+        with ThreadPoolExecutor(max_workers=len(sample) or 1) as executor:
+            results = list(executor.map(
+                lambda user_data: self.test_user_authentication(user_data['email'], user_data['password']),
+                sample
+            ))
+        
         success_count = 0
-        for user_data in users_data[:5]:  # Test first 5 users
-            if self.test_user_authentication(user_data['email'], user_data['password']):
+        for user_data, authenticated in zip(sample, results):
+            if authenticated:
                 success_count += 1
                 print(f"✅ {user_data['email']}: Auth OK")
             else:
@@ -225,11 +461,24 @@ class APISeedClient:
         return success_count
 
 # Convenience functions
-def seed_users_via_api() -> bool:
-    """Seed users via API"""
-    client = APISeedClient()
+@functools.lru_cache(maxsize=1)
+def get_client() -> APISeedClient:
+    """Authenticated client shared by the convenience functions.
     
+    Reuses the session's keep-alive connections and the admin token across
+    seeding phases. Authentication failures raise and are not cached, so the
+    next call tries again.
+    """
+    client = APISeedClient()
     if not client.authenticate_admin():
+        raise RuntimeError("Admin authentication failed")
+    return client
+
+def seed_users_via_api() -> bool:
+    """Seed users via API"""
+    try:
+        client = get_client()
+    except RuntimeError:
         return False
     
     users_data = config.get_users_data()
@@ -242,18 +491,18 @@ def seed_users_via_api() -> bool:
 
 def verify_api_endpoints() -> Dict[str, bool]:
     """Verify API endpoints are working"""
-    client = APISeedClient()
-    
-    if not client.authenticate_admin():
+    try:
+        client = get_client()
+    except RuntimeError:
         return {}
     
     return client.verify_metrics_apis()
 
 def get_current_api_metrics() -> Dict[str, Any]:
     """Get current metrics from API"""
-    client = APISeedClient()
-    
-    if not client.authenticate_admin():
+    try:
+        client = get_client()
+    except RuntimeError:
         return {}
     
-    return client.get_current_metrics()
\ No newline at end of file
+    return client.get_current_metrics()
@@ -3,12 +3,34 @@
 Seed configuration management for dummy data generation
 """
 
+import collections
+import functools
 import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
+# Monthly base series, [Jan, Feb, Mar, Apr, May, Jun, Jul, Aug, Sep, Oct, Nov, Dec]
+_ELECTRICITY_BASE = (1850, 1920, 2100, 2050, 1980, 1650, 1800, 2000, 1700, 1600, 1550, 1400)  # kWh
+_GAS_BASE = (90, 95, 100, 98, 105, 82, 88, 92, 85, 83, 84, 81)  # m³
+_CO2_BASE = (430, 438, 445, 452, 460, 448, 455, 462, 470, 471, 474, 480)  # kg
+
+def _ending_at_month(base_data: tuple, month: int) -> List[float]:
+    """Rotate a Jan..Dec series so the given month (1-12) is at the end"""
+    rotated = collections.deque(base_data)
+    rotated.rotate(-month)
+    return list(rotated)
+
 class SeedConfig:
-    """Configuration for seeding operations"""
+    """Configuration for seeding operations
+    
+    The generated series and seed data are deterministic for an instance, so
+    they are cached_property attributes; callers share the returned objects
+    and must treat them as read-only.
+    """
+    
+    # Previous year data should be higher to show reduction
+    PREV_YEAR_ELECTRICITY_FACTOR = 1.15  # 15% higher
+    PREV_YEAR_GAS_FACTOR = 1.12  # 12% higher
     
     def __init__(self):
         # Environment variables
@@ -28,6 +50,9 @@ class SeedConfig:
         self.active_user_count = 8
         self.months_back = 12
         
+        # Concurrent API requests (and pooled connections) used while seeding
+        self.api_concurrency = int(os.getenv('SEED_API_CONCURRENCY', '16'))
+        
         # Current date for calculations
         self.current_date = datetime.now()
         self.current_year = self.current_date.year
@@ -42,52 +67,44 @@ class SeedConfig:
         
         return f"mysql+mysqlconnector://{user}:{password}@{host}:3306/{database}"
     
+    @functools.cached_property
+    def monthly_electricity(self) -> List[float]:
+        """12 months of electricity data (kWh), ending with the current month"""
+        return _ending_at_month(_ELECTRICITY_BASE, self.current_month)
+    
+    @functools.cached_property
+    def monthly_gas(self) -> List[float]:
+        """12 months of gas data (m³), ending with the current month"""
+        return _ending_at_month(_GAS_BASE, self.current_month)
+    
+    @functools.cached_property
+    def monthly_co2(self) -> List[float]:
+        """12 months of CO2 reduction data (kg), ending with the current month"""
+        return _ending_at_month(_CO2_BASE, self.current_month)
+    
+    @functools.cached_property
+    def previous_year(self) -> Dict[str, List[float]]:
+        """Previous year data for YoY comparison (higher usage = reduction achieved)"""
+        return {
+            'electricity': [v * self.PREV_YEAR_ELECTRICITY_FACTOR for v in self.monthly_electricity],
+            'gas': [v * self.PREV_YEAR_GAS_FACTOR for v in self.monthly_gas]
+        }
+    
     def get_monthly_electricity_data(self) -> List[float]:
         """Get 12 months of electricity data (kWh)"""
-        # [Jan, Feb, Mar, Apr, May, Jun, Jul, Aug, Sep, Oct, Nov, Dec]
-        base_data = [1850, 1920, 2100, 2050, 1980, 1650, 1800, 2000, 1700, 1600, 1550, 1400]
-        
-        # Adjust for current month position
-        current_month_index = self.current_month - 1
-        
-        # Rotate data so current month is at the end
-        rotated_data = base_data[current_month_index+1:] + base_data[:current_month_index+1]
-        
-        return rotated_data
+        return self.monthly_electricity
     
     def get_monthly_gas_data(self) -> List[float]:
         """Get 12 months of gas data (m³)"""
-        base_data = [90, 95, 100, 98, 105, 82, 88, 92, 85, 83, 84, 81]
-        
-        # Adjust for current month position
-        current_month_index = self.current_month - 1
-        rotated_data = base_data[current_month_index+1:] + base_data[:current_month_index+1]
-        
-        return rotated_data
+        return self.monthly_gas
     
     def get_monthly_co2_data(self) -> List[float]:
         """Get 12 months of CO2 reduction data (kg)"""
-        base_data = [430, 438, 445, 452, 460, 448, 455, 462, 470, 471, 474, 480]
-        
-        # Adjust for current month position
-        current_month_index = self.current_month - 1
-        rotated_data = base_data[current_month_index+1:] + base_data[:current_month_index+1]
-        
-        return rotated_data
+        return self.monthly_co2
     
     def get_previous_year_data(self) -> Dict[str, List[float]]:
         """Get previous year data for YoY comparison (higher usage = reduction achieved)"""
-        current_electricity = self.get_monthly_electricity_data()
-        current_gas = self.get_monthly_gas_data()
-        
-        # Previous year data should be higher to show reduction
-        prev_electricity = [x * 1.15 for x in current_electricity]  # 15% higher
-        prev_gas = [x * 1.12 for x in current_gas]  # 12% higher
-        
-        return {
-            'electricity': prev_electricity,
-            'gas': prev_gas
-        }
+        return self.previous_year
     
     def get_date_range_for_month(self, year: int, month: int) -> tuple:
         """Get start and end dates for a given month"""
@@ -100,48 +117,52 @@ class SeedConfig:
             
         return start_date, end_date
     
-    def get_users_data(self) -> List[Dict[str, Any]]:
-        """Get user data for seeding"""
-        users = []
-        departments = ["営業部", "開発部", "マーケティング部", "人事部", "総務部", "経理部", "製造部", "品質管理部"]
+    @functools.cached_property
+    def users_data(self) -> List[Dict[str, Any]]:
+        """User data for seeding"""
+        departments = ("営業部", "開発部", "マーケティング部", "人事部", "総務部", "経理部", "製造部", "品質管理部")
+        departments_len = len(departments)
         
-        for i in range(1, self.user_count + 1):
-            user_data = {
+        return [
+            {
                 'email': f"employee{i:03d}@scope3holdings.co.jp",
                 'password': "demo123",
                 'full_name': f"社員{i:03d}",
-                'department': departments[(i-1) % len(departments)],
+                'department': departments[(i-1) % departments_len],
                 'employee_code': f"EMP{i:03d}",
                 'is_active': i <= self.active_user_count
             }
-            users.append(user_data)
-        
-        return users
+            for i in range(1, self.user_count + 1)
+        ]
     
-    def get_point_data(self) -> List[Dict[str, Any]]:
-        """Get point data for seeding"""
-        point_data = []
-        
-        for i in range(1, self.user_count + 1):
-            # Generate points for each user with varying amounts
-            base_points = 100 + (i * 50)
-            variations = [0.8, 1.0, 1.2, 0.9, 1.1, 0.95]
-            
-            for month_offset in range(6):  # Last 6 months
-                date = self.current_date - timedelta(days=month_offset * 30)
-                points = int(base_points * variations[month_offset])
-                
-                point_data.append({
-                    'user_email': f"employee{i:03d}@scope3holdings.co.jp",
-                    'points': points,
-                    'reason': f"月間エネルギー削減達成 ({date.strftime('%Y年%m月')})",
-                    'earned_at': date
-                })
-        
-        return point_data
+    @functools.cached_property
+    def point_data(self) -> List[Dict[str, Any]]:
+        """Point data for seeding"""
+        variations = [0.8, 1.0, 1.2, 0.9, 1.1, 0.95]
+        
+        # Per-month columns (last 6 months) are shared by every user
+        months = []
+        for month_offset, variation in enumerate(variations):
+            date = self.current_date - timedelta(days=month_offset * 30)
+            reason = f"月間エネルギー削減達成 ({date.strftime('%Y年%m月')})"
+            months.append((variation, reason, date))
+        
+        # Generate points for each user with varying amounts, reusing the
+        # emails already formatted by users_data
+        return [
+            {
+                'user_email': user['email'],
+                'points': int((100 + i * 50) * variation),
+                'reason': reason,
+                'earned_at': date
+            }
+            for i, user in enumerate(self.users_data, 1)
+            for variation, reason, date in months
+        ]
     
-    def get_rewards_data(self) -> List[Dict[str, Any]]:
-        """Get reward data for seeding"""
+    @functools.cached_property
+    def rewards_data(self) -> List[Dict[str, Any]]:
+        """Reward data for seeding"""
         return [
             {
                 'reward_name': 'エコバッグ',
@@ -175,8 +196,9 @@ class SeedConfig:
             }
         ]
     
-    def get_device_types(self) -> List[tuple]:
-        """Get device types for seeding"""
+    @functools.cached_property
+    def device_types(self) -> List[tuple]:
+        """Device types for seeding"""
         return [
             ("スマートメーター", "電力"),
             ("ガスメーター", "ガス"), 
@@ -186,6 +208,22 @@ class SeedConfig:
             ("冷蔵庫", "電力"),
             ("暖房器具", "ガス")
         ]
+    
+    def get_users_data(self) -> List[Dict[str, Any]]:
+        """Get user data for seeding"""
+        return self.users_data
+    
+    def get_point_data(self) -> List[Dict[str, Any]]:
+        """Get point data for seeding"""
+        return self.point_data
+    
+    def get_rewards_data(self) -> List[Dict[str, Any]]:
+        """Get reward data for seeding"""
+        return self.rewards_data
+    
+    def get_device_types(self) -> List[tuple]:
+        """Get device types for seeding"""
+        return self.device_types
 
 # Global config instance
 config = SeedConfig()
\ No newline at end of file
@@ -8,6 +8,10 @@ import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import random
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -28,6 +32,21 @@ try:
 except ImportError:
     from seed_config import config
 
+# Rows per INSERT statement, well below MySQL's max_allowed_packet
+INSERT_BATCH_SIZE = 1000
+
+# Rows fetched per round-trip when streaming existing-key prefetches
+PREFETCH_BATCH_SIZE = 1000
+
+# Missing users below this count are hashed in-process: starting worker
+# processes (and re-importing the app in each) costs more than the hashes
+PARALLEL_HASH_MIN = 32
+
+def chunked(seq: list, size: int):
+    """Yield consecutive slices of seq with at most size items"""
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
 class DatabaseSeeder:
     """Direct database seeding operations"""
     
@@ -46,6 +65,11 @@ class DatabaseSeeder:
             print("✅ Database transaction committed")
         self.session.close()
     
+    def _insert_rows(self, stmt, rows: List[Dict[str, Any]]) -> None:
+        """Execute an INSERT for rows in INSERT_BATCH_SIZE batches within the seed transaction"""
+        for chunk in chunked(rows, INSERT_BATCH_SIZE):
+            self.session.execute(stmt, chunk)
+    
     def ensure_company_exists(self) -> bool:
         """Ensure target company exists"""
         company = self.session.query(Company).filter(Company.id == config.company_id).first()
@@ -72,27 +96,51 @@ class DatabaseSeeder:
         
         created_count = 0
         
-        for user_data in users_data:
-            # Find user by email
-            user = self.session.query(User).filter(User.email == user_data['email']).first()
+        # Users and their employee records, loaded once by email
+        users_by_email = {
+            u.email: u for u in self.session.query(User).filter(
+                User.email.in_([u['email'] for u in users_data])
+            )
+        }
+        employee_user_ids = {
+            user_id for user_id, in self.session.query(Employee.user_id).filter(
+                Employee.user_id.in_([u.id for u in users_by_email.values()])
+            )
+        }
+        
+        # Create missing users (fallback). bcrypt is deliberately slow, so
+        # only these passwords are hashed, in parallel for large batches
+        to_create = [u for u in users_data if u['email'] not in users_by_email]
+        if to_create:
+            passwords = [u['password'] for u in to_create]
+            if len(passwords) < PARALLEL_HASH_MIN:
+                hashes = [get_password_hash(password) for password in passwords]
+            else:
+                max_workers = min(len(passwords), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    hashes = list(executor.map(get_password_hash, passwords))
             
-            if not user:
-                # Create user if not exists (fallback)
+            for user_data, hashed_password in zip(to_create, hashes):
                 user = User(
                     email=user_data['email'],
-                    hashed_password=get_password_hash(user_data['password']),
+                    hashed_password=hashed_password,
                     full_name=user_data['full_name'],
                     is_active=user_data['is_active'],
                     is_superuser=False
                 )
                 self.session.add(user)
-                self.session.flush()
+                users_by_email[user.email] = user
                 print(f"✅ Created user: {user_data['email']}")
             
-            # Check if employee record exists
-            employee = self.session.query(Employee).filter(Employee.user_id == user.id).first()
+            # One flush assigns ids to all the new users
+            self.session.flush()
+        
+        for user_data in users_data:
+            user = users_by_email[user_data['email']]
             
-            if not employee:
+            # Check if employee record exists
+            if user.id not in employee_user_ids:
+                employee_user_ids.add(user.id)
                 employee = Employee(
                     user_id=user.id,
                     company_id=config.company_id,
@@ -103,6 +151,10 @@ class DatabaseSeeder:
                 created_count += 1
                 print(f"✅ Created employee: {user_data['employee_code']}")
         
+        # The session does not autoflush: flush once per step so the next
+        # step's queries see these rows
+        self.session.flush()
+        
         print(f"✅ Created {created_count} employee records")
         return created_count
     
@@ -110,8 +162,10 @@ class DatabaseSeeder:
         """Create devices for all company employees"""
         print("📱 Creating devices for users...")
         
-        # Get all employees in the company
-        employees = self.session.query(Employee).filter(
+        # Get all employees in the company, with their users in the same query
+        employees = self.session.query(Employee, User).join(
+            User, Employee.user_id == User.id
+        ).filter(
             Employee.company_id == config.company_id
         ).all()
         
@@ -120,38 +174,67 @@ class DatabaseSeeder:
             return 0
         
         device_types = config.get_device_types()
-        created_count = 0
+        rows = []
         
-        for employee in employees:
-            user = self.session.query(User).filter(User.id == employee.user_id).first()
-            if not user:
-                continue
-            
-            # Create 2-3 devices per user
-            devices_per_user = random.randint(2, 3)
-            
-            for i in range(devices_per_user):
-                device_name, energy_type = random.choice(device_types)
+        # Existing (owner, device name) pairs, loaded once
+        existing_devices = {
+            (owner_id, name)
+            for owner_id, name in self.session.query(Device.owner_id, Device.name).filter(
+                Device.owner_id.in_([user.id for _, user in employees])
+            )
+        }
+        
+        # Create 2-3 devices per user; all random draws are made up front
+        devices_per_user = random.choices((2, 3), k=len(employees))
+        picks = iter(random.choices(device_types, k=sum(devices_per_user)))
+        
+        for (employee, user), device_count in zip(employees, devices_per_user):
+            for i in range(device_count):
+                device_name, energy_type = next(picks)
                 
                 # Check if device already exists
-                existing_device = self.session.query(Device).filter(
-                    Device.owner_id == user.id,
-                    Device.name == f"{device_name}_{i+1}"
-                ).first()
-                
-                if not existing_device:
-                    device = Device(
-                        owner_id=user.id,
-                        name=f"{device_name}_{i+1}",
-                        device_type=device_name,
-                        location=employee.department,
-                        is_active=True
-                    )
-                    self.session.add(device)
-                    created_count += 1
-        
-        print(f"✅ Created {created_count} devices")
-        return created_count
+                if (user.id, f"{device_name}_{i+1}") not in existing_devices:
+                    existing_devices.add((user.id, f"{device_name}_{i+1}"))
+                    rows.append({
+                        'owner_id': user.id,
+                        'name': f"{device_name}_{i+1}",
+                        'device_type': device_name,
+                        'location': employee.department,
+                        'is_active': True
+                    })
+        
+        # All devices in one batched INSERT; energy seeding re-queries them
+        self._insert_rows(Device.__table__.insert(), rows)
+        
+        print(f"✅ Created {len(rows)} devices")
+        return len(rows)
+    
+    @staticmethod
+    def _energy_rows(devices: List[Device], record_date: datetime, usage_per_device: float,
+                     low: float, high: float, seen: set) -> List[Dict[str, Any]]:
+        """Energy record rows for devices not yet given a row at record_date in this run.
+        
+        Usage varies randomly between low and high times usage_per_device;
+        the variations for the whole device group are drawn in one pass and
+        the new keys are added to seen.
+        """
+        new_devices = [d for d in devices if (d.id, record_date) not in seen]
+        uniform = random.uniform
+        usages = [usage_per_device * uniform(low, high) for _ in new_devices]
+        seen.update((d.id, record_date) for d in new_devices)
+        
+        # energy_consumed and power are FLOAT columns, which store whatever
+        # precision they are given, so the 2-decimal rounding stays here
+        return [
+            {
+                'device_id': device.id,
+                'user_id': device.owner_id,
+                'timestamp': record_date,
+                'energy_consumed': round(usage, 2),
+                'power': round(usage / 30, 2)
+            }
+            for device, usage in zip(new_devices, usages)
+        ]
     
     def create_energy_records(self) -> int:
         """Create energy usage records for last 12 months"""
@@ -174,81 +257,48 @@ class DatabaseSeeder:
         # Previous year data for YoY comparison
         prev_year_data = config.get_previous_year_data()
         
-        created_count = 0
+        # (device, timestamp) pairs generated so far: the previous-year block
+        # overlaps the last 12 months, and the current-year row wins
+        seen = set()
+        records = []
+        
+        # Map device types to energy types; the partition is the same for
+        # every month, including the previous-year block below
+        electricity_types = {"スマートメーター", "エアコン", "照明システム", "冷蔵庫", "electric_meter"}
+        gas_types = {"ガスメーター", "ガス給湯器", "暖房器具", "gas_meter"}
+        
+        electricity_devices = [d for d in devices if d.device_type in electricity_types]
+        gas_devices = [d for d in devices if d.device_type in gas_types]
         
         # Create records for current year (last 12 months)
         for month_offset in range(12):
-            target_date = config.current_date - timedelta(days=month_offset * 30)
-            target_year = target_date.year
-            target_month = target_date.month
+            # Step back whole calendar months: a fixed 30-day step drifts and
+            # can land twice in the same month while skipping another
+            target_year, month_index = divmod(
+                config.current_year * 12 + config.current_month - 1 - month_offset, 12
+            )
             
             # Use first day of month for consistency
-            record_date = datetime(target_year, target_month, 1)
-            
-            month_index = (target_month - 1) % 12
+            record_date = datetime(target_year, month_index + 1, 1)
             
             # Distribute total monthly usage across devices
             total_electricity = electricity_data[month_index]
             total_gas = gas_data[month_index]
             total_co2 = co2_data[month_index]
             
-            # Map device types to energy types
-            electricity_types = ["スマートメーター", "エアコン", "照明システム", "冷蔵庫", "electric_meter"]
-            gas_types = ["ガスメーター", "ガス給湯器", "暖房器具", "gas_meter"]
-            
-            electricity_devices = [d for d in devices if d.device_type in electricity_types]
-            gas_devices = [d for d in devices if d.device_type in gas_types]
-            
             # Create electricity records
             if electricity_devices:
                 usage_per_device = total_electricity / len(electricity_devices)
-                co2_per_device = total_co2 / len(electricity_devices)
-                
-                for device in electricity_devices:
-                    # Check if record already exists
-                    existing = self.session.query(EnergyRecord).filter(
-                        EnergyRecord.device_id == device.id,
-                        EnergyRecord.timestamp == record_date
-                    ).first()
-                    
-                    if not existing:
-                        # Add some variation
-                        variation = random.uniform(0.8, 1.2)
-                        actual_usage = usage_per_device * variation
-                        
-                        record = EnergyRecord(
-                            device_id=device.id,
-                            user_id=device.owner_id,
-                            timestamp=record_date,
-                            energy_consumed=round(actual_usage, 2),
-                            power=round(actual_usage / 30, 2)
-                        )
-                        self.session.add(record)
-                        created_count += 1
+                records.extend(self._energy_rows(
+                    electricity_devices, record_date, usage_per_device, 0.8, 1.2, seen
+                ))
             
             # Create gas records
             if gas_devices:
                 usage_per_device = total_gas / len(gas_devices)
-                
-                for device in gas_devices:
-                    existing = self.session.query(EnergyRecord).filter(
-                        EnergyRecord.device_id == device.id,
-                        EnergyRecord.timestamp == record_date
-                    ).first()
-                    
-                    if not existing:
-                        variation = random.uniform(0.8, 1.2)
-                        actual_usage = usage_per_device * variation
-                        
-                        record = EnergyRecord(
-                            device_id=device.id,
-                            user_id=device.owner_id,
-                            timestamp=record_date,
-                            energy_consumed=round(actual_usage, 2),
-                            power=round(actual_usage / 30, 2)
-                        )
-                        self.session.add(record)
-                        created_count += 1
+                records.extend(self._energy_rows(
+                    gas_devices, record_date, usage_per_device, 0.8, 1.2, seen
+                ))
         
         # Create previous year records for YoY comparison
         prev_year = config.current_year - 1
@@ -262,53 +312,32 @@ class DatabaseSeeder:
             # Create electricity records for previous year
             if electricity_devices:
                 usage_per_device = prev_electricity[month_index] / len(electricity_devices)
-                
-                for device in electricity_devices[:3]:  # Limit to first 3 devices
-                    existing = self.session.query(EnergyRecord).filter(
-                        EnergyRecord.device_id == device.id,
-                        EnergyRecord.timestamp == record_date
-                    ).first()
-                    
-                    if not existing:
-                        variation = random.uniform(0.9, 1.1)
-                        actual_usage = usage_per_device * variation
-                        
-                        record = EnergyRecord(
-                            device_id=device.id,
-                            user_id=device.owner_id,
-                            timestamp=record_date,
-                            energy_consumed=round(actual_usage, 2),
-                            power=round(actual_usage / 30, 2)
-                        )
-                        self.session.add(record)
-                        created_count += 1
+                # Limit to first 3 devices
+                records.extend(self._energy_rows(
+                    electricity_devices[:3], record_date, usage_per_device, 0.9, 1.1, seen
+                ))
             
             # Create gas records for previous year
             if gas_devices:
                 usage_per_device = prev_gas[month_index] / len(gas_devices)
-                
-                for device in gas_devices[:2]:  # Limit to first 2 devices
-                    existing = self.session.query(EnergyRecord).filter(
-                        EnergyRecord.device_id == device.id,
-                        EnergyRecord.timestamp == record_date
-                    ).first()
-                    
-                    if not existing:
-                        variation = random.uniform(0.9, 1.1)
-                        actual_usage = usage_per_device * variation
-                        
-                        record = EnergyRecord(
-                            device_id=device.id,
-                            user_id=device.owner_id,
-                            timestamp=record_date,
-                            energy_consumed=round(actual_usage, 2),
-                            power=round(actual_usage / 30, 2)
-                        )
-                        self.session.add(record)
-                        created_count += 1
-        
-        print(f"✅ Created {created_count} energy records")
-        return created_count
+                # Limit to first 2 devices
+                records.extend(self._energy_rows(
+                    gas_devices[:2], record_date, usage_per_device, 0.9, 1.1, seen
+                ))
+        
+        # Core executemany upsert: no ORM per-row state, and the driver sends
+        # multi-row VALUES batches. Readings already stored for a
+        # (device_id, timestamp) are replaced with this run's values.
+        if records:
+            stmt = mysql_insert(EnergyRecord.__table__)
+            stmt = stmt.on_duplicate_key_update(
+                energy_consumed=stmt.inserted.energy_consumed,
+                power=stmt.inserted.power,
+            )
+            self._insert_rows(stmt, records)
+        
+        print(f"✅ Created or updated {len(records)} energy records")
+        return len(records)
     
     def create_points_and_rankings(self) -> int:
         """Create point records and rankings"""
@@ -324,79 +353,85 @@ class DatabaseSeeder:
             return 0
         
         point_data = config.get_point_data()
-        created_count = 0
+        rows = []
+        
+        # Existing (user, earned_at) pairs, loaded once and streamed
+        existing_points = {
+            (user_id, earned_at)
+            for user_id, earned_at in self.session.query(Point.user_id, Point.earned_at).join(
+                User, Point.user_id == User.id
+            ).filter(
+                User.email.in_({p['user_email'] for p in point_data})
+            ).yield_per(PREFETCH_BATCH_SIZE)
+        }
+        
+        users_by_email = {
+            u.email: u for u in self.session.query(User).filter(
+                User.email.in_({p['user_email'] for p in point_data})
+            )
+        }
         
         for point_item in point_data:
             # Find user by email
-            user = self.session.query(User).filter(
-                User.email == point_item['user_email']
-            ).first()
+            user = users_by_email.get(point_item['user_email'])
             
             if not user:
                 continue
             
             # Check if point record already exists
-            existing_point = self.session.query(Point).filter(
-                Point.user_id == user.id,
-                Point.earned_at == point_item['earned_at']
-            ).first()
-            
-            if not existing_point:
-                point = Point(
-                    user_id=user.id,
-                    company_id=config.company_id,
-                    points=point_item['points'],
-                    reason=point_item['reason'],
-                    earned_at=point_item['earned_at']
-                )
-                self.session.add(point)
-                created_count += 1
-        
-        # Create rankings based on total points
+            if (user.id, point_item['earned_at']) not in existing_points:
+                existing_points.add((user.id, point_item['earned_at']))
+                rows.append({
+                    'user_id': user.id,
+                    'company_id': config.company_id,
+                    'points': point_item['points'],
+                    'reason': point_item['reason'],
+                    'earned_at': point_item['earned_at']
+                })
+        
+        # Core executemany: an ORM flush would INSERT row by row to fetch each
+        # primary key, while the driver batches this into multi-row VALUES
+        self._insert_rows(Point.__table__.insert(), rows)
+        
+        # Create rankings based on total points, including the ones just added
         self._create_rankings(employees)
         
-        print(f"✅ Created {created_count} point records")
-        return created_count
+        print(f"✅ Created {len(rows)} point records")
+        return len(rows)
     
     def _create_rankings(self, employees: List[Employee]):
         """Create ranking records"""
         print("🏆 Creating rankings...")
         
-        user_points = []
-        
-        for employee in employees:
-            total_points = self.session.query(Point).filter(
-                Point.user_id == employee.user_id
-            ).with_entities(Point.points).all()
-            
-            total = sum(p[0] for p in total_points) if total_points else 0
-            user_points.append((employee.user_id, total))
+        # Point totals for all employees in one GROUP BY query
+        user_ids = [employee.user_id for employee in employees]
+        totals = dict(
+            self.session.query(Point.user_id, func.sum(Point.points)).filter(
+                Point.user_id.in_(user_ids)
+            ).group_by(Point.user_id).all()
+        )
+        user_points = [(user_id, int(totals.get(user_id) or 0)) for user_id in user_ids]
         
         # Sort by points descending
         user_points.sort(key=lambda x: x[1], reverse=True)
         
-        # Create ranking records
-        for rank, (user_id, points) in enumerate(user_points, 1):
-            existing_ranking = self.session.query(Ranking).filter(
-                Ranking.user_id == user_id,
-                Ranking.company_id == config.company_id
-            ).first()
-            
-            if existing_ranking:
-                # Update existing ranking
-                existing_ranking.rank = rank
-                existing_ranking.total_points = points
-            else:
-                # Create new ranking
-                ranking = Ranking(
-                    user_id=user_id,
-                    company_id=config.company_id,
-                    rank=rank,
-                    total_points=points,
-                    period_start=config.current_date - timedelta(days=30),
-                    period_end=config.current_date
-                )
-                self.session.add(ranking)
+        # One upsert on the (company_id, user_id) unique key: new users get a
+        # row, existing rankings get the new rank and total
+        rows = [
+            {
+                'user_id': user_id,
+                'company_id': config.company_id,
+                'rank': rank,
+                'total_points': points,
+                'period_start': config.current_date - timedelta(days=30),
+                'period_end': config.current_date
+            }
+            for rank, (user_id, points) in enumerate(user_points, 1)
+        ]
+        if rows:
+            stmt = mysql_insert(Ranking.__table__)
+            stmt = stmt.on_duplicate_key_update(rank=stmt.inserted.rank, total_points=stmt.inserted.total_points)
+            self._insert_rows(stmt, rows)
         
         print(f"✅ Updated rankings for {len(user_points)} users")
     
@@ -407,13 +442,17 @@ class DatabaseSeeder:
         rewards_data = config.get_rewards_data()
         created_count = 0
         
+        # Existing reward titles, loaded once
+        existing_titles = {
+            title for title, in self.session.query(Reward.title).filter(
+                Reward.title.in_([r['reward_name'] for r in rewards_data])
+            )
+        }
+        
         for reward_item in rewards_data:
             # Check if reward already exists
-            existing_reward = self.session.query(Reward).filter(
-                Reward.title == reward_item['reward_name']
-            ).first()
-            
-            if not existing_reward:
+            if reward_item['reward_name'] not in existing_titles:
+                existing_titles.add(reward_item['reward_name'])
                 reward = Reward(
                     title=reward_item['reward_name'],
                     points_required=reward_item['points_required'],
@@ -432,24 +471,30 @@ class DatabaseSeeder:
         """Verify that seeded data is correctly created"""
         print("🔍 Verifying data integrity...")
         
+        # Plain SELECT COUNT(*) statements; ORM Query.count() wraps each
+        # query in a subquery
         counts = {
-            'users': self.session.query(User).count(),
-            'employees': self.session.query(Employee).filter(
-                Employee.company_id == config.company_id
-            ).count(),
-            'devices': self.session.query(Device).join(User).join(Employee).filter(
-                Employee.company_id == config.company_id
-            ).count(),
-            'energy_records': self.session.query(EnergyRecord).join(Device).join(User).join(Employee).filter(
-                Employee.company_id == config.company_id
-            ).count(),
-            'points': self.session.query(Point).filter(
-                Point.company_id == config.company_id
-            ).count(),
-            'rewards': self.session.query(Reward).count(),
-            'rankings': self.session.query(Ranking).filter(
-                Ranking.company_id == config.company_id
-            ).count()
+            'users': self.session.scalar(select(func.count()).select_from(User)),
+            'employees': self.session.scalar(
+                select(func.count()).select_from(Employee).where(Employee.company_id == config.company_id)
+            ),
+            'devices': self.session.scalar(
+                select(func.count()).select_from(Device).join(User).join(Employee).where(
+                    Employee.company_id == config.company_id
+                )
+            ),
+            'energy_records': self.session.scalar(
+                select(func.count()).select_from(EnergyRecord).join(Device).join(User).join(Employee).where(
+                    Employee.company_id == config.company_id
+                )
+            ),
+            'points': self.session.scalar(
+                select(func.count()).select_from(Point).where(Point.company_id == config.company_id)
+            ),
+            'rewards': self.session.scalar(select(func.count()).select_from(Reward)),
+            'rankings': self.session.scalar(
+                select(func.count()).select_from(Ranking).where(Ranking.company_id == config.company_id)
+            )
         }
         
         for entity, count in counts.items():
@@ -457,6 +502,45 @@ class DatabaseSeeder:
         
         return counts
 
+    def collect_metrics(self) -> Dict[str, Any]:
+        """KPI metrics for the current month, computed from this session"""
+        # Get total energy usage for current month
+        current_month_start = datetime(config.current_year, config.current_month, 1)
+        
+        # Get electricity usage (from electricity devices)
+        electricity_types = ["スマートメーター", "エアコン", "照明システム", "冷蔵庫", "electric_meter"]
+        gas_types = ["ガスメーター", "ガス給湯器", "暖房器具", "gas_meter"]
+        
+        # Both usage totals summed by the database in one query, instead
+        # of fetching every record of the month into Python
+        electricity_sum, gas_sum = self.session.execute(
+            select(
+                func.coalesce(func.sum(case(
+                    (Device.device_type.in_(electricity_types), EnergyRecord.energy_consumed)
+                )), 0),
+                func.coalesce(func.sum(case(
+                    (Device.device_type.in_(gas_types), EnergyRecord.energy_consumed)
+                )), 0)
+            ).select_from(EnergyRecord).join(Device).join(User).join(Employee).where(
+                Employee.company_id == config.company_id,
+                EnergyRecord.timestamp >= current_month_start
+            )
+        ).one()
+        
+        active_users = self.session.scalar(
+            select(func.count()).select_from(Employee).where(Employee.company_id == config.company_id)
+        )
+        
+        # Calculate CO2 emissions from usage
+        co2_total = (electricity_sum * 0.518) + (gas_sum * 2.23)  # CO2 factors
+        
+        return {
+            'active_users': active_users,
+            'electricity_total_kwh': electricity_sum,
+            'gas_total_m3': gas_sum,
+            'co2_reduction_total_kg': co2_total
+        }
+
 # Convenience functions
 def seed_database_direct() -> bool:
     """Seed database with all necessary data"""
@@ -502,47 +586,8 @@ def get_database_metrics() -> Dict[str, Any]:
     """Get metrics from database for verification"""
     try:
         with DatabaseSeeder() as seeder:
-            # Get total energy usage for current month
-            current_month_start = datetime(config.current_year, config.current_month, 1)
-            
-            # Get electricity usage (from electricity devices)
-            electricity_types = ["スマートメーター", "エアコン", "照明システム", "冷蔵庫", "electric_meter"]
-            gas_types = ["ガスメーター", "ガス給湯器", "暖房器具", "gas_meter"]
-            
-            electricity_total = seeder.session.query(EnergyRecord).join(Device).join(User).join(Employee).filter(
-                Employee.company_id == config.company_id,
-                Device.device_type.in_(electricity_types),
-                EnergyRecord.timestamp >= current_month_start
-            ).with_entities(EnergyRecord.energy_consumed).all()
-            
-            gas_total = seeder.session.query(EnergyRecord).join(Device).join(User).join(Employee).filter(
-                Employee.company_id == config.company_id,
-                Device.device_type.in_(gas_types),
-                EnergyRecord.timestamp >= current_month_start
-            ).with_entities(EnergyRecord.energy_consumed).all()
-            
-            # Calculate CO2 based on device types and usage
-            all_energy_records = seeder.session.query(EnergyRecord).join(Device).join(User).join(Employee).filter(
-                Employee.company_id == config.company_id,
-                EnergyRecord.timestamp >= current_month_start
-            ).all()
-            
-            active_users = seeder.session.query(Employee).filter(
-                Employee.company_id == config.company_id
-            ).count()
-            
-            # Calculate CO2 emissions from usage
-            electricity_sum = sum(e[0] if e[0] else 0 for e in electricity_total)
-            gas_sum = sum(g[0] if g[0] else 0 for g in gas_total)
-            co2_total = (electricity_sum * 0.518) + (gas_sum * 2.23)  # CO2 factors
-            
-            return {
-                'active_users': active_users,
-                'electricity_total_kwh': electricity_sum,
-                'gas_total_m3': gas_sum,
-                'co2_reduction_total_kg': co2_total
-            }
+            return seeder.collect_metrics()
             
     except Exception as e:
         print(f"Error getting database metrics: {e}")
-        return {}
\ No newline at end of file
+        return {}
@@ -10,12 +10,12 @@ cfg = {
   "ssl_ca": os.getenv("MYSQL_SSL_CA"),
 }
 print("Connecting with:", {k: cfg[k] for k in cfg if k != "password"})
-cn = mysql.connector.connect(
+# Context managers release the cursor and connection even if the query fails
+with mysql.connector.connect(
     host=cfg["host"], port=cfg["port"],
     user=cfg["user"], password=cfg["password"],
     database=cfg["database"], ssl_ca=cfg["ssl_ca"]
-)
-cur = cn.cursor()
-cur.execute("SELECT DATABASE(), VERSION()")
-print("OK:", cur.fetchone())
-cur.close(); cn.close()
\ No newline at end of file
+) as cn:
+    with cn.cursor() as cur:
+        cur.execute("SELECT DATABASE(), VERSION()")
+        print("OK:", cur.fetchone())
\ No newline at end of file